@@ -9,6 +9,7 @@ from apps.base_tables.models import (
     AgencyUnit, EmployeePosition, CrimeCategory, DeviceCategory, DeviceModel, ProcedureCategory, DocumentCategory
 )
 from apps.core.models import ExtractionUnit
+from apps.core.forms import CachedChoicesFormMixin
 from apps.requisitions.models import ExtractionRequest
 from django.contrib.auth.models import User
 
@@ -252,10 +253,23 @@ class CaseUpdateForm(forms.ModelForm):
         return amount
 
 
-class CaseSearchForm(forms.Form):
+# Chaves de cache das opções dos selects do CaseSearchForm (invalidadas em apps.cases.signals)
+SEARCH_CHOICES_CACHE_KEYS = {
+    'requester_agency_unit': 'cases:search_choices:requester_agency_unit',
+    'extraction_unit': 'cases:search_choices:extraction_unit',
+    'assigned_to': 'cases:search_choices:assigned_to',
+    'crime_category': 'cases:search_choices:crime_category',
+}
+SEARCH_CHOICES_CACHE_TIMEOUT = 300
+
+
+class CaseSearchForm(CachedChoicesFormMixin, forms.Form):
     """
     Formulário para busca/filtro de processos
     """
+    cached_choices_keys = SEARCH_CHOICES_CACHE_KEYS
+    cached_choices_timeout = SEARCH_CHOICES_CACHE_TIMEOUT
+    
     search = forms.CharField(
         required=False,
         label='Pesquisar',
@@ -338,10 +352,20 @@ class CaseSearchForm(forms.Form):
     )
 
 
-class CaseDeviceForm(forms.ModelForm):
+# Opções de categoria e modelo do formulário de dispositivos (cases.signals descarta)
+DEVICE_FORM_CHOICES_CACHE_KEYS = {
+    'device_category': 'cases:device_form_choices:device_category',
+    'device_model': 'cases:device_form_choices:device_model',
+}
+DEVICE_FORM_CHOICES_CACHE_TIMEOUT = 300
+
+
+class CaseDeviceForm(CachedChoicesFormMixin, forms.ModelForm):
     """
     Formulário para criar e editar dispositivos de um processo
     """
+    cached_choices_keys = DEVICE_FORM_CHOICES_CACHE_KEYS
+    cached_choices_timeout = DEVICE_FORM_CHOICES_CACHE_TIMEOUT
     
     class Meta:
         model = CaseDevice
@@ -533,34 +557,6 @@ class CaseDeviceForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.case = kwargs.pop('case', None)
         super().__init__(*args, **kwargs)
-        
-        # Ordena os querysets
-        self.fields['device_category'].queryset = DeviceCategory.objects.filter(
-            deleted_at__isnull=True
-        ).order_by('-default_selection', 'name')
-        self.fields['device_model'].queryset = DeviceModel.objects.filter(
-            deleted_at__isnull=True
-        ).select_related('brand').order_by('brand__name', 'name')
-        
-        # Garante que device_category é obrigatório (já é no modelo, mas reforça)
-        self.fields['device_category'].required = True
-        
-        # Torna campos opcionais
-        self.fields['owner_name'].required = False
-        self.fields['password_type'].required = False
-        self.fields['device_model'].required = False
-        
-        # Configura campos booleanos para não serem obrigatórios
-        boolean_fields = [
-            'is_turned_on', 'is_locked', 'is_password_known', 'is_damaged',
-            'has_fluids', 'has_sim_card', 'has_memory_card', 
-            'has_other_accessories', 'is_sealed', 'is_imei_unknown'
-        ]
-        for field_name in boolean_fields:
-            if field_name in self.fields:
-                self.fields[field_name].required = False
-
-        self.fields['device_category'].empty_label = None
 
     def clean(self):
         cleaned_data = super().clean()
@@ -574,6 +570,44 @@ class CaseDeviceForm(forms.ModelForm):
         return cleaned_data
 
 
+def _configure_case_device_form_fields(fields):
+    """
+    Configuração fixa dos campos do CaseDeviceForm, aplicada uma única vez em
+    base_fields (cada instância recebe uma cópia já configurada). Os querysets
+    precisam estar definidos antes do CachedChoicesFormMixin montar as opções.
+    """
+    # Ordena os querysets
+    fields['device_category'].queryset = DeviceCategory.objects.filter(
+        deleted_at__isnull=True
+    ).order_by('-default_selection', 'name')
+    fields['device_model'].queryset = DeviceModel.objects.filter(
+        deleted_at__isnull=True
+    ).select_related('brand').order_by('brand__name', 'name')
+    
+    # Garante que device_category é obrigatório (já é no modelo, mas reforça)
+    fields['device_category'].required = True
+    
+    # Torna campos opcionais
+    fields['owner_name'].required = False
+    fields['password_type'].required = False
+    fields['device_model'].required = False
+    
+    # Configura campos booleanos para não serem obrigatórios
+    boolean_fields = [
+        'is_turned_on', 'is_locked', 'is_password_known', 'is_damaged',
+        'has_fluids', 'has_sim_card', 'has_memory_card', 
+        'has_other_accessories', 'is_sealed', 'is_imei_unknown'
+    ]
+    for field_name in boolean_fields:
+        if field_name in fields:
+            fields[field_name].required = False
+
+    fields['device_category'].empty_label = None
+
+
+_configure_case_device_form_fields(CaseDeviceForm.base_fields)
+
+
 class CaseProcedureForm(forms.ModelForm):
     """
     Formulário para criar e editar procedimentos de um processo
@@ -5,6 +5,9 @@ from apps.cases.models import Case, CaseDevice, CaseProcedure
 from apps.cases.services.case_service import CaseService
 from apps.core.middleware import set_current_user
 
+# Tamanho do bloco lido do banco ao percorrer os cases elegíveis
+ITERATOR_CHUNK_SIZE = 2000
+
 
 class Command(BaseCommand):
     help = "Busca cases com pelo menos 1 device e 1 procedure que tenham registration_completed_at None e executa a lógica de complete registration"
@@ -152,7 +155,7 @@ class Command(BaseCommand):
             )
             
             # Mostrar detalhes dos cases encontrados
-            for case in eligible_cases:
+            for case in eligible_cases.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
                 self.stdout.write(
                     f"📋 Case ID: {case.id} | "
                     f"Devices: {case.device_count} | "
@@ -170,7 +173,8 @@ class Command(BaseCommand):
 
         self.stdout.write("🚀 Iniciando processamento dos cases...")
 
-        for case in eligible_cases:
+        # Itera em blocos para não manter todas as instâncias em memória
+        for case in eligible_cases.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
             try:
                 with transaction.atomic():
                     # Completar o registro primeiro
@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction, models
 from django.utils import timezone
 from django.contrib.auth.models import User
-from apps.cases.models import Case, Extraction
+from apps.cases.models import Case, CaseDevice, Extraction
 from apps.cases.services.case_service import CaseService
 from apps.cases.services.extraction_service import ExtractionService
 from apps.configs.services.extractor_service import check_user_assignment_to_unit
@@ -89,7 +89,14 @@ class Command(BaseCommand):
             'requester_agency_unit',
             'requester_authority_position',
             'crime_type'
-        ).prefetch_related('case_devices')
+        ).prefetch_related(
+            # device_extraction via JOIN: a verificação "já possui extração" abaixo
+            # não dispara uma consulta por dispositivo
+            models.Prefetch(
+                'case_devices',
+                queryset=CaseDevice.objects.select_related('device_extraction')
+            )
+        )
 
         # Aplicar limite se especificado
         if limit:
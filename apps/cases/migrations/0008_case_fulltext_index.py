@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.db import migrations
+
+
+FULLTEXT_INDEX_NAME = 'case_search_fulltext'
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Cria o índice FULLTEXT usado pela busca de casos (somente MySQL)"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'CREATE FULLTEXT INDEX {FULLTEXT_INDEX_NAME} ON `case` '
+        '(number, request_procedures, requester_authority_name, additional_info, legacy_number)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(f'DROP INDEX {FULLTEXT_INDEX_NAME} ON `case`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0007_add_extractions_completed_case_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
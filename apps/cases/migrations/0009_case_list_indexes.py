@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base_tables', '0003_add_default_selection_to_document_category'),
+        ('cases', '0008_case_fulltext_index'),
+        ('core', '0005_extractionunitstoragemedia_is_default_and_more'),
+        ('requisitions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['deleted_at', '-priority', '-created_at'], name='case_deleted_587ae3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['status', 'deleted_at', '-priority', '-created_at'], name='case_status_1a017c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['assigned_to', 'deleted_at', '-priority', '-created_at'], name='case_assigne_861aa1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['extraction_unit', 'deleted_at', '-priority', '-created_at'], name='case_extract_1085cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['requested_at'], name='case_request_c94b58_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0009_case_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True, verbose_name='Atualizado em')),
+                ('deleted_at', models.DateTimeField(blank=True, default=None, null=True, verbose_name='Excluído em')),
+                ('version', models.IntegerField(default=1, verbose_name='Versão do Registro')),
+                ('text', models.TextField(help_text='Texto da observação.')),
+                ('case', models.ForeignKey(help_text='Processo.', on_delete=django.db.models.deletion.PROTECT, related_name='notes', to='cases.case')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_deleted', to=settings.AUTH_USER_MODEL, verbose_name='Excluído por')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Atualizado por')),
+            ],
+            options={
+                'verbose_name': 'Observação do Processo',
+                'verbose_name_plural': 'Observações do Processo',
+                'db_table': 'case_note',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['case'], name='case_note_case_id_f66797_idx'), models.Index(fields=['created_at'], name='case_note_created_4b39e8_idx')],
+            },
+        ),
+    ]
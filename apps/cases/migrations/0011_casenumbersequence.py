@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0010_casenote'),
+        ('core', '0005_extractionunitstoragemedia_is_default_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(help_text='Ano da sequência.')),
+                ('last_value', models.IntegerField(default=0, help_text='Último número sequencial emitido.')),
+                ('extraction_unit', models.ForeignKey(help_text='Unidade de extração.', on_delete=django.db.models.deletion.PROTECT, related_name='case_number_sequences', to='core.extractionunit')),
+            ],
+            options={
+                'verbose_name': 'Sequência de Número de Processo',
+                'verbose_name_plural': 'Sequências de Número de Processo',
+                'db_table': 'case_number_sequence',
+                'unique_together': {('extraction_unit', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0011_casenumbersequence'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='case',
+            name='case_request_c94b58_idx',
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['deleted_at', 'requested_at'], name='case_deleted_c9d08e_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0012_case_requested_at_index'),
+    ]
+
+    operations = [
+        # Cria o índice composto antes de remover o antigo: no MySQL a FK case_id
+        # precisa de um índice que a atenda durante toda a migração.
+        migrations.AddIndex(
+            model_name='casedevice',
+            index=models.Index(fields=['case', 'deleted_at'], name='case_device_case_id_a2c464_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='casedevice',
+            name='case_device_case_id_efca76_idx',
+        ),
+    ]
@@ -0,0 +1,35 @@
+"""
+Mixins de views do app cases
+"""
+from django.contrib import messages
+from django.shortcuts import get_object_or_404, redirect
+
+from apps.cases.models import Case
+
+
+class CaseAccessMixin:
+    """
+    Carrega em self.case o processo (não deletado) da URL e só deixa seguir quem
+    pode editá-lo (Case.is_editable_by); os demais voltam para a edição do
+    processo com case_permission_denied_message.
+    """
+    case_url_kwarg = 'case_pk'
+    case_permission_denied_message = 'Você não tem permissão para alterar este processo. Apenas o responsável pode fazer isso.'
+    
+    def dispatch(self, request, *args, **kwargs):
+        self.case = get_object_or_404(
+            Case.objects.active(),
+            pk=kwargs[self.case_url_kwarg]
+        )
+        
+        if not self.case.is_editable_by(request.user):
+            return self.handle_case_permission_denied(request)
+        
+        return super().dispatch(request, *args, **kwargs)
+    
+    def handle_case_permission_denied(self, request):
+        """
+        Resposta para quem não pode editar o processo
+        """
+        messages.error(request, self.case_permission_denied_message)
+        return redirect('cases:update', pk=self.case.pk)
@@ -1,6 +1,6 @@
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from apps.core.models import (
@@ -10,6 +10,7 @@ from apps.core.models import (
 from apps.base_tables.models import ProcedureCategory, DocumentCategory
 from apps.requisitions.models import ExtractionRequest
 from apps.core.models import AbstractDeviceModel
+from apps.core.managers import CaseManager
 
 
 class Case(AbstractCaseModel):
@@ -171,6 +172,7 @@ class Case(AbstractCaseModel):
         help_text=_("Observações legadas do processo.")
     )
     
+    objects = CaseManager()
     
     class Meta:
         db_table = 'case'
@@ -185,6 +187,15 @@ class Case(AbstractCaseModel):
             models.Index(fields=['year']),
             models.Index(fields=['assigned_to']),
             models.Index(fields=['created_at']),
+            # Listagens: WHERE deleted_at IS NULL [AND filtro] ORDER BY -priority, -created_at.
+            # O MySQL não tem índice parcial; deleted_at entra como primeira coluna
+            # (IS NULL é busca por igualdade) e a ordenação é atendida pelo índice.
+            models.Index(fields=['deleted_at', '-priority', '-created_at']),
+            models.Index(fields=['status', 'deleted_at', '-priority', '-created_at']),
+            models.Index(fields=['assigned_to', 'deleted_at', '-priority', '-created_at']),
+            models.Index(fields=['extraction_unit', 'deleted_at', '-priority', '-created_at']),
+            # Filtros de data por intervalo sobre requested_at, apenas entre os não excluídos
+            models.Index(fields=['deleted_at', 'requested_at']),
         ]
 
 
@@ -223,11 +234,23 @@ class Case(AbstractCaseModel):
         }
         return status_colors.get(self.status, 'danger')
     
+    @property
+    def display_number(self):
+        """Número do processo, ou #pk enquanto ainda não foi numerado (títulos de página)"""
+        return self.number or f"#{self.pk}"
+    
     @property
     def status_badge_class(self):
         """Returns complete Bootstrap badge class for status"""
         return f"bg-{self.get_status_color()}"
     
+    def is_editable_by(self, user):
+        """
+        Processo sem responsável pode ser editado por qualquer usuário;
+        com responsável, apenas por ele. Compara só os ids (sem consulta).
+        """
+        return not self.assigned_to_id or self.assigned_to_id == user.pk
+    
     def get_progress_percentage(self):
         """
         Calcula a porcentagem de progresso baseado no status do case
@@ -301,16 +324,29 @@ class Case(AbstractCaseModel):
         
         Retorna o número gerado ou None se não houver extraction_unit
         """
-        if not self.extraction_unit:
+        if not self.extraction_unit_id:
             return None
         
         current_year = timezone.now().year
-        extraction_unit_id = self.extraction_unit.pk
+        next_sequential = CaseNumberSequence.next_value(
+            self.extraction_unit_id,
+            current_year,
+            initial=lambda: self._get_max_sequential(current_year)
+        )
+        
+        # Formata o número: AAAA.UUU.NNNN
+        case_number = f"{current_year}.{self.extraction_unit_id:03d}.{next_sequential:04d}"
         
-        # Busca todos os casos da extraction_unit no ano corrente para encontrar o maior número sequencial
+        return case_number
+    
+    def _get_max_sequential(self, year):
+        """
+        Maior número sequencial já usado pela extraction_unit no ano, obtido
+        varrendo os números existentes. Usado apenas para inicializar a sequência.
+        """
         cases = Case.objects.filter(
-            extraction_unit=self.extraction_unit,
-            year=current_year,
+            extraction_unit_id=self.extraction_unit_id,
+            year=year,
             number__isnull=False,
             deleted_at__isnull=True
         ).exclude(
@@ -329,20 +365,14 @@ class Case(AbstractCaseModel):
                         # Verifica se o ano e extraction_unit correspondem
                         case_year = int(parts[0])
                         case_unit_id = int(parts[1])
-                        if case_year == current_year and case_unit_id == extraction_unit_id:
+                        if case_year == year and case_unit_id == self.extraction_unit_id:
                             sequential = int(parts[2])
                             if sequential > max_sequential:
                                 max_sequential = sequential
                     except (ValueError, IndexError):
                         continue
         
-        # Próximo número sequencial
-        next_sequential = max_sequential + 1
-        
-        # Formata o número: AAAA.UUU.NNNN
-        case_number = f"{current_year}.{extraction_unit_id:03d}.{next_sequential:04d}"
-        
-        return case_number
+        return max_sequential
     
     def update_status_based_on_extractions(self):
         """
@@ -360,32 +390,31 @@ class Case(AbstractCaseModel):
         if self.status == self.CASE_STATUS_COMPLETED:
             return
 
-        # Busca todas as extrações não deletadas do case
-        extractions = self.case_devices.filter(
-            deleted_at__isnull=True
-        ).exclude(
-            device_extraction__isnull=True
-        ).values_list(
-            'device_extraction__status', 
-            flat=True
+        # Conta as extrações dos dispositivos não deletados por status, no banco
+        counts = Extraction.objects.filter(
+            case_device__case=self,
+            case_device__deleted_at__isnull=True
+        ).aggregate(
+            total=models.Count('pk'),
+            pending_count=models.Count('pk', filter=models.Q(status=Extraction.STATUS_PENDING)),
+            assigned_count=models.Count('pk', filter=models.Q(status=Extraction.STATUS_ASSIGNED)),
+            in_progress_count=models.Count('pk', filter=models.Q(status=Extraction.STATUS_IN_PROGRESS)),
+            paused_count=models.Count('pk', filter=models.Q(status=Extraction.STATUS_PAUSED)),
+            completed_count=models.Count('pk', filter=models.Q(status=Extraction.STATUS_COMPLETED)),
         )
+        total = counts['total']
         
         # Se não houver extrações, mantém o status atual ou volta para draft
-        if not extractions:
+        if not total:
             if self.status not in [self.CASE_STATUS_DRAFT, self.CASE_STATUS_WAITING_COLLECT]:
-                self.status = self.CASE_STATUS_DRAFT
-                self.save(update_fields=['status'])
+                self._set_status(self.CASE_STATUS_DRAFT)
             return
         
-        extraction_statuses = list(extractions)
-        total = len(extraction_statuses)
-        
-        # Conta quantas extrações estão em cada status
-        pending_count = extraction_statuses.count('pending')
-        assigned_count = extraction_statuses.count('assigned')
-        in_progress_count = extraction_statuses.count('in_progress')
-        paused_count = extraction_statuses.count('paused')
-        completed_count = extraction_statuses.count('completed')
+        pending_count = counts['pending_count']
+        assigned_count = counts['assigned_count']
+        in_progress_count = counts['in_progress_count']
+        paused_count = counts['paused_count']
+        completed_count = counts['completed_count']
         
         # Lógica de decisão do status do Case
         new_status = None
@@ -413,7 +442,7 @@ class Case(AbstractCaseModel):
         # Se todas estiverem pendentes (aguardando extrator)
         # Mas se o case já está atribuído a um usuário, mantém WAITING_START
         elif pending_count == total:
-            if self.assigned_to:
+            if self.assigned_to_id:
                 new_status = self.CASE_STATUS_WAITING_START
             else:
                 new_status = self.CASE_STATUS_WAITING_EXTRACTOR
@@ -424,9 +453,91 @@ class Case(AbstractCaseModel):
         
         # Atualiza o status se houver mudança
         if new_status and self.status != new_status:
-            self.status = new_status
-            self.save(update_fields=['status'])
+            self._set_status(new_status)
     
+    def _set_status(self, status):
+        """
+        Grava o status com um UPDATE direto (sem save completo nem sinais),
+        mantendo as colunas de auditoria e a versão como o save() faria
+        """
+        from apps.core.middleware import get_current_user
+        from apps.cases.utils import invalidate_case_list_cache
+        
+        fields = {
+            'status': status,
+            'updated_at': timezone.now(),
+            'version': models.F('version') + 1,
+        }
+        current_user = get_current_user()
+        if current_user:
+            fields['updated_by'] = current_user
+        Case.objects.filter(pk=self.pk).update(**fields)
+        
+        # Mantém a instância em memória igual à linha gravada
+        self.status = status
+        self.updated_at = fields['updated_at']
+        if current_user:
+            self.updated_by = current_user
+        self.refresh_from_db(fields=['version'])
+        invalidate_case_list_cache()
+    
+
+class CaseNumberSequence(models.Model):
+    """
+    Último número sequencial de processo emitido por extraction_unit e ano.
+
+    O incremento é feito com UPDATE ... SET last_value = last_value + 1, que
+    bloqueia apenas a linha da unidade/ano até o fim da transação, evitando
+    varrer os números existentes e a corrida entre finalizações simultâneas.
+    """
+    extraction_unit = models.ForeignKey(
+        ExtractionUnit,
+        on_delete=models.PROTECT,
+        related_name='case_number_sequences',
+        help_text=_("Unidade de extração.")
+    )
+    year = models.IntegerField(
+        help_text=_("Ano da sequência.")
+    )
+    last_value = models.IntegerField(
+        default=0,
+        help_text=_("Último número sequencial emitido.")
+    )
+
+    class Meta:
+        db_table = 'case_number_sequence'
+        verbose_name = "Sequência de Número de Processo"
+        verbose_name_plural = "Sequências de Número de Processo"
+        unique_together = ('extraction_unit', 'year')
+
+    def __str__(self):
+        return f"{self.year}.{self.extraction_unit_id:03d}: {self.last_value}"
+
+    @classmethod
+    def next_value(cls, extraction_unit_id, year, initial=None):
+        """
+        Incrementa e retorna o próximo número da sequência da unidade/ano.
+
+        Se a sequência ainda não existir, é criada a partir de initial()
+        (maior número já emitido), permitindo adotar a tabela com dados existentes.
+        """
+        sequence = cls.objects.filter(extraction_unit_id=extraction_unit_id, year=year)
+        
+        with transaction.atomic():
+            if not sequence.update(last_value=models.F('last_value') + 1):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            extraction_unit_id=extraction_unit_id,
+                            year=year,
+                            last_value=(initial() if initial else 0) + 1
+                        )
+                except IntegrityError:
+                    # Outra requisição criou a sequência ao mesmo tempo
+                    sequence.update(last_value=models.F('last_value') + 1)
+            
+            return sequence.values_list('last_value', flat=True).get()
+
 
 class CaseProcedure(AuditedModel):
     """ Model for Case Procedures """
@@ -496,7 +607,10 @@ class CaseDevice(AbstractDeviceModel):
         verbose_name = _('Dispositivo do Processo')
         verbose_name_plural = _('Dispositivos do Processo')
         indexes = [
-            models.Index(fields=['case']),
+            # Dispositivos não excluídos de um processo: WHERE case_id = ? AND
+            # deleted_at IS NULL. O MySQL não tem índice parcial; o índice composto
+            # atende a busca e também as consultas só por case_id (prefixo).
+            models.Index(fields=['case', 'deleted_at']),
             models.Index(fields=['device_model']),
             models.Index(fields=['created_at']),
         ]
@@ -965,4 +1079,29 @@ class CaseDocument(AuditedModel):
             models.Index(fields=['case']),
             models.Index(fields=['created_at']),
         ]
-        
\ No newline at end of file
+        
+
+class CaseNote(AuditedModel):
+    """ Model for Case Notes (observações registradas ao longo do processo) """
+    case = models.ForeignKey(
+        Case,
+        on_delete=models.PROTECT,
+        related_name='notes',
+        help_text=_("Processo.")
+    )
+    text = models.TextField(
+        help_text=_("Texto da observação.")
+    )
+
+    class Meta:
+        db_table = 'case_note'
+        verbose_name = "Observação do Processo"
+        verbose_name_plural = "Observações do Processo"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['case']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.case} - {self.created_at:%d/%m/%Y %H:%M}"
@@ -2,7 +2,7 @@
 Service for CaseDevice business logic
 """
 from django.db.models import Q, QuerySet
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from apps.core.services.base import BaseService, ValidationServiceException
 from apps.cases.models import CaseDevice
@@ -85,8 +85,14 @@ class CaseDeviceService(BaseService):
         
         return data
     
-    def update(self, pk: int, data: Dict[str, Any]) -> CaseDevice:
-        """Update case device with version increment"""
+    def update(self, pk: int, data: Dict[str, Any],
+               changed_fields: Optional[List[str]] = None) -> CaseDevice:
+        """
+        Update case device with version increment.
+
+        Se changed_fields for informado (ex.: form.changed_data), grava apenas
+        essas colunas e as de auditoria/versão; sem ele, salva a linha inteira.
+        """
         instance = self.get_object(pk)
         
         if not self.validate_permissions('update', instance):
@@ -106,6 +112,15 @@ class CaseDeviceService(BaseService):
         for field, value in validated_data.items():
             setattr(instance, field, value)
         
-        instance.save()
+        if changed_fields is None:
+            instance.save()
+            return instance
+        
+        # UPDATE restrito ao que mudou no formulário
+        model_fields = {field.name for field in instance._meta.concrete_fields}
+        update_fields = [field for field in changed_fields if field in model_fields]
+        instance.save(update_fields=list(dict.fromkeys(
+            [*update_fields, 'updated_by', 'updated_at', 'version']
+        )))
         return instance
 
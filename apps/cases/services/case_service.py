@@ -1,13 +1,20 @@
 """
 Service for Case business logic
 """
-from django.db.models import Q, QuerySet, Count
-from django.db import transaction
+from django.db.models import Q, QuerySet, Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
+from datetime import timedelta
 from typing import Dict, Any, List, Optional
 
-from apps.core.services.base import BaseService, ValidationServiceException
-from apps.cases.models import Case, Extraction
+from apps.core.services.base import BaseService, PermissionServiceException, ValidationServiceException
+from apps.cases.models import Case, CaseDevice, CaseDocument, CaseNote, CaseProcedure, Extraction
+from apps.cases.utils import (
+    CASE_FULLTEXT_FIELDS, build_fulltext_query, get_fulltext_search_ids, invalidate_case_list_cache
+)
+from apps.base_tables.models import AgencyUnit
 
 
 class CaseService(BaseService):
@@ -15,6 +22,12 @@ class CaseService(BaseService):
     
     model_class = Case
     
+    # Colunas alteradas ao atribuir/desatribuir um processo
+    ASSIGNMENT_UPDATE_FIELDS = [
+        'assigned_to', 'assigned_at', 'assigned_by', 'status',
+        'updated_by', 'updated_at', 'version',
+    ]
+    
     def get_queryset(self) -> QuerySet:
         """Get Cases queryset with related data"""
         queryset = super().get_queryset().select_related(
@@ -34,45 +47,95 @@ class CaseService(BaseService):
         
         return queryset
     
+    def get_list_queryset(self, filters: Dict[str, Any]) -> QuerySet:
+        """
+        Queryset filtrado para as listagens de casos, carregando apenas as
+        colunas exibidas. Campos de texto longo e o arquivo de despacho
+        ficam de fora; as páginas de detalhe continuam carregando tudo.
+        
+        Parte do queryset base, sem a contagem de dispositivos de get_queryset
+        (JOIN + GROUP BY sobre todas as colunas), que as listagens não exibem.
+        """
+        if not self.validate_permissions('list'):
+            raise PermissionServiceException("Sem permissão para listar")
+        
+        queryset = self._apply_extraction_unit_filter(
+            super().get_queryset().order_by('-priority', '-created_at')
+        )
+        if filters:
+            queryset = self.apply_filters(queryset, filters)
+        
+        return queryset.select_related(
+            'requester_agency_unit',
+            'extraction_unit',
+            'assigned_to'
+        ).only(
+            'id',
+            'number',
+            'year',
+            'status',
+            'priority',
+            'request_procedures',
+            'requested_at',
+            'requested_device_amount',
+            'assigned_at',
+            'created_at',
+            'requester_agency_unit__acronym',
+            'extraction_unit__acronym',
+            'assigned_to__username',
+            'assigned_to__first_name',
+            'assigned_to__last_name',
+        )
+    
+    def get_visible_extraction_unit_ids(self) -> Optional[List[int]]:
+        """
+        Unidades de extração cujos casos o usuário vê: None quando não há
+        restrição (superusuário ou usuário que não é extrator), senão a lista
+        ordenada de ids (vazia para extrator sem unidades vinculadas).
+        Calculada uma vez por instância do service.
+        """
+        if hasattr(self, '_visible_extraction_unit_ids'):
+            return self._visible_extraction_unit_ids
+        
+        unit_ids = None
+        if self.user and not self.user.is_superuser:
+            try:
+                from apps.core.models import ExtractorUser
+                
+                # Busca todos os ExtractorUser vinculados ao usuário
+                extractor_users = ExtractorUser.objects.filter(
+                    user=self.user,
+                    deleted_at__isnull=True
+                ).prefetch_related('extraction_unit_extractors')
+                
+                # Usuário que não é extrator vê tudo
+                if extractor_users.exists():
+                    # Obtém todas as extraction_units vinculadas aos extractors do usuário
+                    extraction_unit_ids = set()
+                    for extractor in extractor_users:
+                        extraction_unit_ids.update(extractor.extraction_unit_extractors.filter(
+                            deleted_at__isnull=True
+                        ).values_list('extraction_unit_id', flat=True))
+                    unit_ids = sorted(extraction_unit_ids)
+            except Exception:
+                # Em caso de erro, não restringe
+                unit_ids = None
+        
+        self._visible_extraction_unit_ids = unit_ids
+        return unit_ids
+    
     def _apply_extraction_unit_filter(self, queryset: QuerySet) -> QuerySet:
         """
         Filtra queryset baseado nas extraction_units do usuário extrator.
         Superusuários veem todos os dados.
         """
-        if not self.user or self.user.is_superuser:
-            return queryset
-        
-        try:
-            from apps.core.models import ExtractorUser
-            
-            # Busca todos os ExtractorUser vinculados ao usuário
-            extractor_users = ExtractorUser.objects.filter(
-                user=self.user,
-                deleted_at__isnull=True
-            ).prefetch_related('extraction_unit_extractors')
-            
-            if not extractor_users.exists():
-                # Não é um extrator, retorna queryset completo
-                return queryset
-            
-            # Obtém todas as extraction_units vinculadas aos extractors do usuário
-            extraction_unit_ids = []
-            for extractor in extractor_users:
-                unit_ids = extractor.extraction_unit_extractors.filter(
-                    deleted_at__isnull=True
-                ).values_list('extraction_unit_id', flat=True)
-                extraction_unit_ids.extend(unit_ids)
-            
-            if not extraction_unit_ids:
-                # Extrator sem unidades vinculadas
-                return queryset.none()
-            
-            # Filtra pelo campo extraction_unit
-            return queryset.filter(extraction_unit__in=extraction_unit_ids)
-            
-        except Exception:
-            # Em caso de erro, retorna queryset completo
+        unit_ids = self.get_visible_extraction_unit_ids()
+        if unit_ids is None:
             return queryset
+        if not unit_ids:
+            # Extrator sem unidades vinculadas
+            return queryset.none()
+        return queryset.filter(extraction_unit__in=unit_ids)
     
     @transaction.atomic
     def create(self, data: Dict[str, Any]) -> Case:
@@ -131,10 +194,10 @@ class CaseService(BaseService):
         
         # Se estiver atualizando e assigned_to mudou
         elif instance and 'assigned_to' in data:
-            old_assigned_to = instance.assigned_to
             new_assigned_to = data.get('assigned_to')
+            new_assigned_to_id = new_assigned_to.pk if new_assigned_to else None
             
-            if old_assigned_to != new_assigned_to:
+            if instance.assigned_to_id != new_assigned_to_id:
                 if new_assigned_to:
                     # Verifica se o cadastro está finalizado antes de atribuir
                     registration_completed = data.get('registration_completed_at') or instance.registration_completed_at
@@ -175,7 +238,14 @@ class CaseService(BaseService):
     
     def update(self, pk: int, data: Dict[str, Any]) -> Case:
         """Update case with version increment"""
-        instance = self.get_object(pk)
+        # Apenas a linha do caso: sem os JOINs/contagem de get_queryset e sem o
+        # arquivo do ofício, que o UPDATE por update_fields não reescreve
+        try:
+            instance = self._apply_extraction_unit_filter(
+                super().get_queryset()
+            ).defer('dispatch_file').get(pk=pk)
+        except Case.DoesNotExist:
+            raise ValidationServiceException("Case não encontrado")
         
         if not self.validate_permissions('update', instance):
             from apps.core.services.base import PermissionServiceException
@@ -187,21 +257,38 @@ class CaseService(BaseService):
         if self.user:
             validated_data['updated_by'] = self.user
         
-        # Increment version
-        validated_data['version'] = instance.version + 1
-        
         # Update fields
         for field, value in validated_data.items():
             setattr(instance, field, value)
         
-        instance.save()
+        # Grava só as colunas do formulário (sem reescrever dispatch_file etc.)
+        model_fields = {field.name for field in instance._meta.concrete_fields}
+        update_fields = [field for field in validated_data if field in model_fields]
+        self._save_with_new_version(instance, [*update_fields, 'updated_by', 'updated_at'])
         return instance
     
+    @staticmethod
+    def _save_with_new_version(case: Case, update_fields: List[str]) -> None:
+        """
+        Salva o caso incrementando version no próprio UPDATE (F('version') + 1),
+        sem perder incrementos de edições simultâneas, e recarrega o valor gravado.
+        """
+        case.version = F('version') + 1
+        case.save(update_fields=list(dict.fromkeys([*update_fields, 'version'])))
+        case.refresh_from_db(fields=['version'])
+    
+    def delete(self, pk: int) -> bool:
+        """Soft delete do caso, descartando as listagens em cache"""
+        # O soft delete é um UPDATE direto, que não dispara post_save
+        deleted = super().delete(pk)
+        invalidate_case_list_cache()
+        return deleted
+    
     def assign_to_user(self, case_pk: int, user) -> Case:
         """Assign case to a user"""
         case = self.get_object(case_pk)
         
-        if case.assigned_to == user:
+        if case.assigned_to_id == user.pk:
             return case  # Já está atribuído
         
         # Verifica se o cadastro está finalizado
@@ -215,7 +302,6 @@ class CaseService(BaseService):
         case.assigned_at = timezone.now()
         case.assigned_by = self.user
         case.updated_by = self.user
-        case.version += 1
         
         # Atualiza o status baseado nas extrações primeiro
         case.update_status_based_on_extractions()
@@ -226,8 +312,8 @@ class CaseService(BaseService):
         if case.status in [case.CASE_STATUS_WAITING_EXTRACTOR, case.CASE_STATUS_DRAFT]:
             case.status = case.CASE_STATUS_WAITING_START
         
-        # Salva todas as alterações
-        case.save()
+        # Grava apenas as colunas da atribuição (UPDATE menor, sinais mantidos)
+        self._save_with_new_version(case, self.ASSIGNMENT_UPDATE_FIELDS)
         
         return case
     
@@ -236,7 +322,7 @@ class CaseService(BaseService):
         case = self.get_object(case_pk)
         
         # Verifica se o caso está atribuído ao usuário
-        if case.assigned_to != user:
+        if case.assigned_to_id != user.pk:
             raise ValidationServiceException(
                 "Você não tem permissão para desatribuir este processo. Apenas o responsável pode se desatribuir."
             )
@@ -246,7 +332,6 @@ class CaseService(BaseService):
         case.assigned_at = None
         case.assigned_by = None
         case.updated_by = self.user
-        case.version += 1
         
         # Atualiza status baseado nas extrações primeiro
         case.update_status_based_on_extractions()
@@ -255,13 +340,13 @@ class CaseService(BaseService):
         # volta para WAITING_EXTRACTOR já que o case não está mais atribuído
         if case.status == case.CASE_STATUS_WAITING_START:
             case.status = case.CASE_STATUS_WAITING_EXTRACTOR
-            case.save(update_fields=['status'])
-        else:
-            # Se já foi atualizado pelo método anterior, apenas salva
-            case.save()
+        
+        # Grava apenas as colunas da atribuição (UPDATE menor, sinais mantidos)
+        self._save_with_new_version(case, self.ASSIGNMENT_UPDATE_FIELDS)
         
         return case
     
+    @transaction.atomic
     def complete_registration(self, case_pk: int, create_extractions: bool = False, notes: Optional[str] = None) -> Case:
         """Complete case registration and optionally create extractions"""
         case = self.get_object(case_pk)
@@ -273,14 +358,14 @@ class CaseService(BaseService):
         if case.registration_completed_at:
             raise ValidationServiceException("O cadastro deste processo já foi finalizado")
         
+        requirements = self.get_registration_requirements(case)
+        
         # Check if has devices
-        devices_count = case.case_devices.filter(deleted_at__isnull=True).count()
-        if devices_count == 0:
+        if not requirements['has_devices']:
             raise ValidationServiceException("É necessário cadastrar pelo menos um dispositivo antes de finalizar o cadastro do processo")
         
         # Check if has procedures
-        procedures_count = case.procedures.filter(deleted_at__isnull=True).count()
-        if procedures_count == 0:
+        if not requirements['has_procedures']:
             raise ValidationServiceException("É necessário cadastrar pelo menos um procedimento antes de finalizar o cadastro do processo")
         
         # Complete registration
@@ -295,23 +380,34 @@ class CaseService(BaseService):
                 case.number = case_number
                 case.year = timezone.now().year
         
-        # Add notes if provided
-        if notes:
-            if case.additional_info:
-                case.additional_info += f"\n\n[Finalização de Cadastro - {timezone.now().strftime('%d/%m/%Y %H:%M')}]\n{notes}"
-            else:
-                case.additional_info = f"[Finalização de Cadastro - {timezone.now().strftime('%d/%m/%Y %H:%M')}]\n{notes}"
-        
         # Update case status
         case.status = Case.CASE_STATUS_WAITING_EXTRACTOR
         case.save()
         
+        # Registra as observações como nota própria, sem reescrever additional_info
+        if notes:
+            CaseNote.objects.create(
+                case=case,
+                text=f"[Finalização de Cadastro]\n{notes}",
+                created_by=self.user
+            )
+        
         # Create extractions if requested
         if create_extractions:
             self.create_extractions_for_case(case)
         
         return case
     
+    def get_devices_without_extraction(self, case: Case) -> QuerySet:
+        """
+        Dispositivos ativos do caso que ainda não têm extração.
+        O OneToOne reverso vira um LEFT JOIN limitado aos dispositivos do caso.
+        """
+        return case.case_devices.filter(
+            deleted_at__isnull=True,
+            device_extraction__isnull=True
+        )
+    
     def create_extractions_for_case(self, case: Case) -> List[Extraction]:
         """Create extractions for all devices in case that don't have extraction"""
         # Validate that case registration is completed
@@ -321,22 +417,33 @@ class CaseService(BaseService):
                 "Finalize o cadastro do caso antes de criar extrações."
             )
         
-        devices_without_extraction = case.case_devices.filter(
-            deleted_at__isnull=True,
-            device_extraction__isnull=True
-        )
-        extractions = []
-        
-        for device in devices_without_extraction:
-            extraction = Extraction.objects.create(
-                case_device=device,
-                status=Extraction.STATUS_PENDING,
-                created_by=self.user
+        with transaction.atomic():
+            # Bloqueia a linha do caso: chamadas simultâneas para o mesmo caso
+            # esperam aqui em vez de tentar criar a mesma extração duas vezes
+            list(Case.objects.select_for_update().filter(pk=case.pk).values_list('pk', flat=True))
+            
+            # Apenas os ids são necessários para criar as extrações
+            device_ids = self.get_devices_without_extraction(case).values_list('pk', flat=True)
+            
+            # bulk_create não passa por AuditedModel.save(), por isso os campos
+            # de auditoria são preenchidos explicitamente
+            extractions = [
+                Extraction(
+                    case_device_id=device_id,
+                    status=Extraction.STATUS_PENDING,
+                    created_by=self.user,
+                    updated_by=self.user
+                )
+                for device_id in device_ids
+            ]
+            
+            Extraction.objects.bulk_create(
+                extractions,
+                batch_size=getattr(settings, 'EXTRACTION_BULK_BATCH_SIZE', 500)
             )
-            extractions.append(extraction)
             
-        # Update case status based on extractions
-        case.update_status_based_on_extractions()
+            # Update case status based on extractions
+            case.update_status_based_on_extractions()
         
         return extractions
     
@@ -368,6 +475,44 @@ class CaseService(BaseService):
             ).count(),
         }
     
+    @staticmethod
+    def _related_count(queryset: QuerySet) -> Coalesce:
+        """
+        COUNT das linhas ativas do caso em subconsulta correlacionada própria
+        (usa o índice por case, sem JOIN entre as relações 1:N)
+        """
+        related = queryset.filter(case=OuterRef('pk'), deleted_at__isnull=True).order_by().values('case')
+        return Coalesce(Subquery(related.annotate(total=Count('pk')).values('total')[:1]), 0)
+    
+    def get_related_counts(self, case: Case) -> Dict[str, int]:
+        """
+        Conta dispositivos, procedimentos e documentos ativos do caso,
+        além dos dispositivos sem extração, em uma única consulta.
+        """
+        counts = {
+            'devices_count': self._related_count(CaseDevice.objects.all()),
+            'procedures_count': self._related_count(CaseProcedure.objects.all()),
+            'documents_count': self._related_count(CaseDocument.objects.all()),
+            'devices_without_extraction': self._related_count(
+                CaseDevice.objects.filter(device_extraction__isnull=True)
+            ),
+        }
+        return Case.objects.filter(pk=case.pk).values(**counts).get()
+    
+    def get_registration_requirements(self, case: Case) -> Dict[str, bool]:
+        """
+        Verifica, em uma única consulta com EXISTS, se o caso possui ao menos
+        um dispositivo e um procedimento ativos (requisitos para finalizar o cadastro).
+        """
+        return Case.objects.filter(pk=case.pk).annotate(
+            has_devices=Exists(
+                CaseDevice.objects.filter(case=OuterRef('pk'), deleted_at__isnull=True)
+            ),
+            has_procedures=Exists(
+                CaseProcedure.objects.filter(case=OuterRef('pk'), deleted_at__isnull=True)
+            ),
+        ).values('has_devices', 'has_procedures').get()
+    
     def get_my_cases(self) -> QuerySet:
         """Get cases assigned to the current user"""
         if not self.user:
@@ -379,49 +524,82 @@ class CaseService(BaseService):
         """Apply search filters to Case queryset"""
         
         if search := filters.get('search'):
-            queryset = queryset.filter(
-                Q(number__icontains=search) |
-                Q(request_procedures__icontains=search) |
-                Q(requester_authority_name__icontains=search) |
-                Q(additional_info__icontains=search) |
-                Q(legacy_number__icontains=search) |
-                Q(requester_agency_unit__name__icontains=search) |
-                Q(requester_agency_unit__acronym__icontains=search)
-            )
-            
+            queryset = self._apply_search(queryset, search)
+        
+        # Todos os filtros são sobre colunas do próprio caso: monta as condições
+        # e aplica um único filter() em vez de clonar a query a cada filtro
+        lookups = {}
+        
         if status := filters.get('status'):
-            queryset = queryset.filter(status=status)
+            lookups['status'] = status
             
         priority = filters.get('priority')
         if priority is not None and priority != '':
-            queryset = queryset.filter(priority=int(priority))
+            lookups['priority'] = int(priority)
             
         if requester_agency_unit := filters.get('requester_agency_unit'):
-            queryset = queryset.filter(requester_agency_unit=requester_agency_unit)
+            lookups['requester_agency_unit'] = requester_agency_unit
             
         if extraction_unit := filters.get('extraction_unit'):
-            queryset = queryset.filter(extraction_unit=extraction_unit)
+            lookups['extraction_unit'] = extraction_unit
             
         if assigned_to := filters.get('assigned_to'):
-            queryset = queryset.filter(assigned_to=assigned_to)
+            lookups['assigned_to'] = assigned_to
             
         if crime_category := filters.get('crime_category'):
-            queryset = queryset.filter(crime_category=crime_category)
+            lookups['crime_category'] = crime_category
             
+        # Intervalos sobre a própria coluna (em vez de __date) para usar o índice de requested_at
         if date_from := filters.get('date_from'):
-            queryset = queryset.filter(requested_at__date__gte=date_from)
+            lookups['requested_at__gte'] = self._start_of_day(date_from)
             
         if date_to := filters.get('date_to'):
-            queryset = queryset.filter(requested_at__date__lte=date_to)
+            lookups['requested_at__lt'] = self._start_of_day(date_to + timedelta(days=1))
             
         if year := filters.get('year'):
-            queryset = queryset.filter(year=year)
+            lookups['year'] = year
             
         if created_year := filters.get('created_year'):
-            queryset = queryset.filter(created_at__year=created_year)
+            lookups['created_at__year'] = created_year
+        
+        if lookups:
+            queryset = queryset.filter(**lookups)
         
         return queryset
     
+    def _apply_search(self, queryset: QuerySet, search: str) -> QuerySet:
+        """
+        Aplica a busca textual.
+
+        No MySQL usa o índice FULLTEXT das colunas de texto do caso, que
+        inclui número e número legado, e casa a unidade solicitante por
+        subconsulta; cada critério é resolvido em separado (UNION de ids).
+        Pelo índice, cada termo casa com o início de uma palavra: número e
+        número legado deixam de casar por trecho no meio de uma palavra
+        (o icontains casava). Nos demais bancos, ou com termos curtos demais
+        para o índice, mantém a busca por icontains.
+        """
+        fulltext_query = build_fulltext_query(search)
+        if connection.vendor != 'mysql' or not fulltext_query:
+            return queryset.filter(
+                Q(number__icontains=search) |
+                Q(request_procedures__icontains=search) |
+                Q(requester_authority_name__icontains=search) |
+                Q(additional_info__icontains=search) |
+                Q(legacy_number__icontains=search) |
+                Q(requester_agency_unit__name__icontains=search) |
+                Q(requester_agency_unit__acronym__icontains=search)
+            )
+
+        agency_unit_ids = AgencyUnit.objects.filter(
+            Q(name__icontains=search) | Q(acronym__icontains=search)
+        ).values('pk')
+
+        return queryset.filter(pk__in=get_fulltext_search_ids(
+            Case, CASE_FULLTEXT_FIELDS, fulltext_query,
+            Q(requester_agency_unit__in=agency_unit_ids)
+        ))
+
     @transaction.atomic
     def create_case_from_requisition(self, requisition, user, mark_request_as_received: bool = False, receipt_notes: str = None) -> Case:
         """
@@ -1,10 +1,19 @@
 """
 Signals para o app cases
 """
-from django.db.models.signals import pre_save, post_save
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
+from apps.base_tables.models import AgencyUnit, CrimeCategory, DeviceBrand, DeviceCategory, DeviceModel
+from apps.core.models import ExtractionUnit, ExtractorUser
+from apps.core.signals import post_soft_delete
+from apps.extractions.forms import SEARCH_CHOICES_CACHE_KEYS as EXTRACTION_SEARCH_CHOICES_CACHE_KEYS
+from apps.requisitions.forms import SEARCH_CHOICES_CACHE_KEYS as REQUEST_SEARCH_CHOICES_CACHE_KEYS
+from .forms import DEVICE_FORM_CHOICES_CACHE_KEYS, SEARCH_CHOICES_CACHE_KEYS
 from .models import Case
+from .utils import invalidate_case_list_cache
 
 
 @receiver(pre_save, sender=Case)
@@ -12,33 +21,72 @@ def generate_oficio_on_case_completion(sender, instance, **kwargs):
     """
     Gera ofício automaticamente quando um caso é finalizado.
     """
-    # Verifica se o caso já existe no banco
-    if instance.pk:
+    # Só interessa um caso existente sendo salvo como COMPLETED, com finished_at
+    # e ainda sem ofício; os demais saves não consultam o banco
+    if not (instance.pk and
+            instance.status == Case.CASE_STATUS_COMPLETED and
+            instance.finished_at and
+            not instance.dispatch_number):
+        return
+    
+    # Verifica se o status mudou para COMPLETED (só o status anterior é lido)
+    old_status = Case.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    if old_status is not None and old_status != Case.CASE_STATUS_COMPLETED:
         try:
-            old_instance = Case.objects.get(pk=instance.pk)
-            # Verifica se o status mudou para COMPLETED e finished_at foi definido
-            if (old_instance.status != Case.CASE_STATUS_COMPLETED and 
-                instance.status == Case.CASE_STATUS_COMPLETED and
-                instance.finished_at and
-                not instance.dispatch_number):  # Só gera se ainda não tem ofício
-                
-                try:
-                    from apps.core.services.dispatch_service import DispatchService
-                    dispatch_service = DispatchService()
-                    dispatch_data = dispatch_service.generate_dispatch(instance)
-                    
-                    # Atualiza o caso com os dados do ofício
-                    instance.dispatch_number = dispatch_data['number']
-                    instance.dispatch_date = dispatch_data['date']
-                    instance.dispatch_file = dispatch_data['file']
-                    instance.dispatch_filename = dispatch_data['filename']
-                    instance.dispatch_content_type = dispatch_data['content_type']
-                    
-                except Exception as e:
-                    # Log do erro mas não impede o salvamento
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Erro ao gerar ofício para caso {instance.pk}: {str(e)}")
-                    # Não levanta exceção para não impedir a finalização do caso
-        except Case.DoesNotExist:
-            pass
+            from apps.core.services.dispatch_service import DispatchService
+            dispatch_service = DispatchService()
+            dispatch_data = dispatch_service.generate_dispatch(instance)
+            
+            # Atualiza o caso com os dados do ofício
+            instance.dispatch_number = dispatch_data['number']
+            instance.dispatch_date = dispatch_data['date']
+            instance.dispatch_file = dispatch_data['file']
+            instance.dispatch_filename = dispatch_data['filename']
+            instance.dispatch_content_type = dispatch_data['content_type']
+            
+        except Exception as e:
+            # Log do erro mas não impede o salvamento
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.error(f"Erro ao gerar ofício para caso {instance.pk}: {str(e)}")
+            # Não levanta exceção para não impedir a finalização do caso
+
+
+@receiver([post_save, post_delete, post_soft_delete], sender=AgencyUnit)
+@receiver([post_save, post_delete], sender=ExtractionUnit)
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete, post_soft_delete], sender=CrimeCategory)
+@receiver([post_save, post_delete], sender=ExtractorUser)
+def invalidate_case_search_choices(sender, update_fields=None, **kwargs):
+    """
+    Descarta as opções em cache dos selects dos formulários de busca de
+    processos, solicitações e extrações quando uma das tabelas de origem é alterada.
+    """
+    # O login grava só last_login (update_last_login), que não aparece nos selects
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    
+    cache.delete_many([
+        *SEARCH_CHOICES_CACHE_KEYS.values(),
+        *REQUEST_SEARCH_CHOICES_CACHE_KEYS.values(),
+        *EXTRACTION_SEARCH_CHOICES_CACHE_KEYS.values(),
+    ])
+
+
+@receiver([post_save, post_delete, post_soft_delete], sender=DeviceCategory)
+@receiver([post_save, post_delete, post_soft_delete], sender=DeviceBrand)
+@receiver([post_save, post_delete, post_soft_delete], sender=DeviceModel)
+def invalidate_case_device_form_choices(sender, **kwargs):
+    """
+    Descarta as opções em cache de categoria e modelo do formulário de
+    dispositivos quando categorias, marcas (parte do rótulo) ou modelos mudam.
+    """
+    cache.delete_many(list(DEVICE_FORM_CHOICES_CACHE_KEYS.values()))
+
+
+@receiver([post_save, post_delete], sender=Case)
+def invalidate_case_list(sender, **kwargs):
+    """
+    Descarta as listagens de processos em cache quando um processo é alterado.
+    """
+    invalidate_case_list_cache()
@@ -1,3 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from apps.base_tables.models import (
+    AgencyUnit, DeviceBrand, DeviceCategory, DeviceModel, DocumentCategory, ProcedureCategory
+)
+from apps.cases.models import Case, CaseDevice, CaseDocument, CaseProcedure, Extraction
+from apps.core.models import ExtractionAgency, ExtractionUnit, ExtractorUser
+
+
+class CaseDetailViewQueriesTest(TestCase):
+    """
+    Número de consultas da página de detalhe do processo: a lista de extrações
+    é avaliada uma vez, com extratores e usuários no mesmo SELECT (sem N+1).
+    """
+    # Sessão, usuário, caso, contagens relacionadas, extrações, agência de
+    # extração e extrator (context processors), perfil do usuário e notas
+    expected_queries = 9
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'x')
+        agency = ExtractionAgency.objects.create(acronym='AG', name='Agência')
+        cls.extraction_unit = ExtractionUnit.objects.create(agency=agency, acronym='NEXT', name='Next')
+        agency_unit = AgencyUnit.objects.create(name='Delegacia', acronym='DL')
+        cls.device_category = DeviceCategory.objects.create(name='Celular', acronym='CEL')
+        brand = DeviceBrand.objects.create(name='Marca', acronym='MRC')
+        cls.device_model = DeviceModel.objects.create(brand=brand, name='Modelo')
+        procedure_category = ProcedureCategory.objects.create(name='Inquérito', acronym='IP')
+        document_category = DocumentCategory.objects.create(name='Ofício', acronym='OFS')
+
+        cls.extractor = ExtractorUser.objects.create(
+            user=User.objects.create_user('extrator', password='x'),
+            extraction_agency=agency,
+        )
+        cls.case = Case.objects.create(
+            extraction_unit=cls.extraction_unit,
+            requester_agency_unit=agency_unit,
+            created_by=cls.user,
+            request_procedures='IP 1/2024',
+            # A tabela de extrações só é exibida com o cadastro finalizado
+            registration_completed_at=timezone.now(),
+        )
+        CaseProcedure.objects.create(case=cls.case, procedure_category=procedure_category, number='1')
+        CaseProcedure.objects.create(case=cls.case, procedure_category=procedure_category, number='2')
+        CaseDocument.objects.create(case=cls.case, document_category=document_category, number='OF-1')
+        for index in range(3):
+            cls.add_extraction(index)
+
+    @classmethod
+    def add_extraction(cls, index):
+        device = CaseDevice.objects.create(
+            case=cls.case,
+            device_category=cls.device_category,
+            device_model=cls.device_model,
+            imei_01=f'35000000000000{index}',
+        )
+        return Extraction.objects.create(
+            case_device=device,
+            status=Extraction.STATUS_COMPLETED,
+            assigned_to=cls.extractor,
+            started_by=cls.extractor,
+            finished_by=cls.extractor,
+            finished_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('cases:detail', kwargs={'pk': self.case.pk})
+
+    def test_detail_query_count(self):
+        with self.assertNumQueries(self.expected_queries):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['extractions_count'], 3)
+
+    def test_detail_query_count_does_not_grow_with_extractions(self):
+        for index in range(3, 8):
+            self.add_extraction(index)
+
+        with self.assertNumQueries(self.expected_queries):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['extractions_count'], 8)
@@ -1,10 +1,14 @@
 """
 Utility functions for cases app
 """
+import hashlib
 import re
-from typing import List
+import uuid
+from typing import Any, Dict, List
+from django.core.cache import cache
 from django.contrib.auth.models import User
-from apps.cases.models import Case, CaseProcedure
+from django.db.models import Count, F, FloatField, Func, Max, OuterRef, Q, Subquery
+from apps.cases.models import Case, CaseDevice, CaseDocument, CaseProcedure
 from apps.base_tables.models import ProcedureCategory
 
 
@@ -79,3 +83,256 @@ def parse_request_procedures(request_procedures_text: str, case: Case, user: Use
     
     return errors
 
+
+
+# Colunas cobertas pelo índice FULLTEXT criado na migração 0008 (somente MySQL)
+CASE_FULLTEXT_FIELDS = (
+    'number',
+    'request_procedures',
+    'requester_authority_name',
+    'additional_info',
+    'legacy_number',
+)
+
+# Colunas cobertas pelo índice FULLTEXT de extraction_request (migração requisitions 0003)
+EXTRACTION_REQUEST_FULLTEXT_FIELDS = (
+    'request_procedures',
+    'requester_authority_name',
+    'additional_info',
+)
+
+# Tamanho mínimo de token indexado pelo InnoDB (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+
+class MatchAgainst(Func):
+    """
+    Expressão MATCH (...) AGAINST (... IN BOOLEAN MODE) do MySQL.
+
+    Retorna a relevância da busca; valores maiores que zero indicam que
+    o registro casa com a consulta.
+    """
+    template = 'MATCH (%(expressions)s) AGAINST (%(query)s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *expressions, query, **extra):
+        super().__init__(*expressions, **extra)
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        extra_context['query'] = '%s'
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.query)
+
+
+def get_fulltext_search_ids(model, fields, fulltext_query: str, *extra_lookups: Q) -> List[int]:
+    """
+    Ids de model que casam com MATCH (fields) AGAINST (fulltext_query) ou com
+    algum dos filtros extras.
+
+    Cada critério é um SELECT próprio, unidos por UNION em uma única consulta:
+    o MySQL só usa o índice FULLTEXT com o MATCH fora de um OR. O resultado é
+    materializado em lista porque um IN (... UNION ...) vira subconsulta
+    dependente, avaliada linha a linha.
+    """
+    base = model._default_manager.order_by()
+    branches = [
+        base.alias(
+            search_rank=MatchAgainst(*fields, query=fulltext_query)
+        ).filter(search_rank__gt=0).values_list('pk', flat=True)
+    ]
+    branches.extend(base.filter(lookup).values_list('pk', flat=True) for lookup in extra_lookups)
+    return list(branches[0].union(*branches[1:]))
+
+
+def build_fulltext_query(search: str) -> str:
+    """
+    Converte o termo de busca em uma consulta booleana do MySQL,
+    exigindo todos os tokens e permitindo casamento por prefixo.
+
+    Retorna string vazia quando nenhum token atinge o tamanho mínimo
+    indexado, situação em que a busca deve usar LIKE.
+    """
+    tokens = re.findall(r'\w+', search)
+    if not tokens or any(len(token) < FULLTEXT_MIN_TOKEN_SIZE for token in tokens):
+        return ''
+    return ' '.join(f'+{token}*' for token in tokens)
+
+
+# Versão das listagens de casos em cache; trocada sempre que um caso muda
+CASE_LIST_VERSION_CACHE_KEY = 'cases:list:version'
+
+
+def get_case_list_cache_version() -> str:
+    """Retorna a versão corrente das listagens de casos em cache"""
+    return cache.get_or_set(CASE_LIST_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_case_list_cache() -> None:
+    """Invalida todas as listagens de casos em cache trocando a versão"""
+    cache.set(CASE_LIST_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+# Colunas exibidas na lista de dispositivos (cases/case_devices.html)
+CASE_DEVICE_LIST_FIELDS = (
+    'id', 'case', 'color', 'owner_name', 'is_imei_unknown',
+    'imei_01', 'imei_02', 'imei_03', 'imei_04', 'imei_05',
+    'device_category__name',
+    'device_model__name',
+    'device_model__brand__name',
+)
+
+
+def get_case_devices_for_list(case: Case):
+    """
+    Dispositivos não deletados do caso, com categoria e modelo/marca, como
+    exibidos na página de dispositivos (cases/case_devices.html). Carrega
+    apenas as colunas da lista; para editar um dispositivo, busque-o à parte.
+    """
+    return case.case_devices.filter(deleted_at__isnull=True).select_related(
+        'device_category',
+        'device_model__brand'
+    ).only(*CASE_DEVICE_LIST_FIELDS)
+
+
+def get_device_model_label(device) -> str:
+    """
+    Retorna "marca - modelo" do dispositivo, apenas o modelo quando não há
+    marca, ou "Sem modelo".
+    """
+    device_model = device.device_model
+    if not device_model:
+        return 'Sem modelo'
+    if device_model.brand:
+        return f"{device_model.brand.name} - {device_model.name}"
+    return device_model.name or 'Sem modelo'
+
+
+def get_device_cover_text(device) -> str:
+    """
+    Retorna a descrição do dispositivo usada nas capas do processo (PDF e ODT):
+    marca e modelo, cor e primeiro IMEI.
+    """
+    parts = []
+    if device.device_model:
+        parts.append(f"{device.device_model.brand.name} {device.device_model.name}")
+    else:
+        parts.append("DISPOSITIVO")
+    if device.color:
+        parts.append(device.color)
+    if device.imei_01:
+        parts.append(f"IMEI: {device.imei_01}")
+    return " - ".join(parts)
+
+
+def get_user_display_name(user, default: str = 'N/A') -> str:
+    """
+    Retorna o nome completo do usuário, ou o username se não houver nome.
+    Sem usuário retorna default.
+    """
+    if not user:
+        return default
+    return user.get_full_name() or user.username
+
+
+COVER_USER_FIELDS = ('id', 'first_name', 'last_name', 'username')
+
+
+def get_cover_user_deferred_fields(*relations: str) -> List[str]:
+    """
+    Campos de User que as capas não exibem (senha, e-mail, datas...), prefixados
+    pelas relações informadas, para usar em .defer() junto com select_related.
+    Só COVER_USER_FIELDS são carregados, o suficiente para get_user_display_name.
+    """
+    return [
+        f'{relation}__{field.attname}'
+        for relation in relations
+        for field in User._meta.concrete_fields
+        if field.attname not in COVER_USER_FIELDS
+    ]
+
+
+def format_cover_date(value) -> str:
+    """
+    Formata uma data/datetime como dd/mm/aaaa para as capas, montando o texto
+    direto dos campos em vez de passar pelo strftime.
+    """
+    return f"{value.day:02d}/{value.month:02d}/{value.year:04d}"
+
+
+def get_category_item_text(category, number=None) -> str:
+    """
+    Retorna o texto de um procedimento ou documento nas capas do processo:
+    nome da categoria, seguido do número quando houver.
+    """
+    if number:
+        return f"{category.name} - {number}"
+    return category.name
+
+
+# Relações do caso exibidas nas capas e as tabelas de apoio cujos nomes aparecem
+# em cada linha (categoria, modelo/marca)
+COVER_STAMP_RELATIONS = (
+    ('devices', CaseDevice, ('device_category', 'device_model', 'device_model__brand')),
+    ('procedures', CaseProcedure, ('procedure_category',)),
+    ('documents', CaseDocument, ('document_category',)),
+)
+
+# Relações do próprio caso (select_related em for_cover) exibidas nas capas
+COVER_STAMP_CASE_RELATIONS = ('requester_agency_unit', 'requester_authority_position', 'extraction_unit')
+COVER_STAMP_USER_RELATIONS = ('created_by', 'assigned_to', 'finished_by')
+
+
+def get_cover_stamp_annotations() -> Dict[str, Any]:
+    """
+    Anotações com o último updated_at e o total de linhas de dispositivos,
+    procedimentos e documentos do caso, o último updated_at das tabelas de
+    apoio exibidas nessas linhas e o updated_at da solicitação de origem;
+    mudam sempre que uma capa muda.
+    """
+    stamps = {
+        # Mesmo JOIN de extraction_request_procedures em for_cover
+        'extraction_request_updated_at': F('extraction_request__updated_at'),
+    }
+    for prefix, model, lookups in COVER_STAMP_RELATIONS:
+        related = model.objects.filter(case=OuterRef('pk')).order_by().values('case')
+        stamps[f'{prefix}_updated_at'] = Subquery(related.annotate(stamp=Max('updated_at')).values('stamp')[:1])
+        stamps[f'{prefix}_total'] = Subquery(related.annotate(total=Count('pk')).values('total')[:1])
+        for lookup in lookups:
+            stamps[f'{prefix}_{lookup}_updated_at'] = Subquery(
+                related.annotate(stamp=Max(f'{lookup}__updated_at')).values('stamp')[:1]
+            )
+    return stamps
+
+
+def get_cover_stamp(case: Case, *extra) -> str:
+    """
+    Identifica o estado de uma capa do processo (caso obtido com
+    Case.objects.for_cover()): muda quando o caso, seus dispositivos,
+    procedimentos ou documentos, as tabelas de apoio, unidades e usuários
+    exibidos, ou os valores extras informados mudam. Retorna um hash curto,
+    seguro para chave de cache.
+    """
+    parts = [
+        case.pk,
+        case.updated_at,
+        case.extraction_request_updated_at,
+        *extra,
+    ]
+    for prefix, _model, lookups in COVER_STAMP_RELATIONS:
+        parts.append(getattr(case, f'{prefix}_updated_at'))
+        parts.append(getattr(case, f'{prefix}_total'))
+        parts.extend(getattr(case, f'{prefix}_{lookup}_updated_at') for lookup in lookups)
+    for relation in COVER_STAMP_CASE_RELATIONS:
+        related = getattr(case, relation)
+        parts.append(related.updated_at if related else None)
+    # User não tem updated_at: entram os campos exibidos (nome ou username)
+    for relation in COVER_STAMP_USER_RELATIONS:
+        user = getattr(case, relation)
+        parts.append(f'{user.pk}|{user.get_full_name()}|{user.username}' if user else None)
+    
+    raw = ':'.join(
+        str(int(part.timestamp() * 1000000)) if hasattr(part, 'timestamp') else str(part)
+        for part in parts
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
@@ -1,14 +1,24 @@
 """
 View para gerar capa do processo em formato ODT
 """
+import logging
+from io import BytesIO
+from typing import Any, Dict
+
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import View
 from django.http import HttpResponse
-from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
 
 from apps.cases.models import Case
+from apps.cases.utils import (
+    format_cover_date, get_category_item_text, get_cover_stamp, get_device_cover_text,
+    get_user_display_name
+)
 
 # ODT (odfpy) é opcional. Se não estiver instalado, só a geração de capa ODT ficará indisponível.
 try:
@@ -35,10 +45,118 @@ except ModuleNotFoundError:
     _ODFPY_AVAILABLE = False
 
 
+logger = logging.getLogger(__name__)
+
+
+# Estilos da capa em ODT: chave -> (nome, família, [(propriedades, atributos)]).
+# As definições são fixas; os elementos Style são criados a cada documento porque
+# o odfpy remove um nó do documento anterior ao anexá-lo a outro.
+_COVER_ODT_STYLES = {
+    # Estilos de texto
+    'bold': ('BoldStyle', 'text', [
+        (TextProperties, {'fontweight': 'bold'}),
+    ]),
+    # Estilo para número do documento (fundo cinza, centralizado, borda)
+    'doc_number': ('DocNumberStyle', 'paragraph', [
+        (ParagraphProperties, {
+            'backgroundcolor': '#d3d3d3',
+            'textalign': 'center',
+            'border': '0.03cm solid #999999',
+            'padding': '0.28cm 0.53cm',
+        }),
+        (TextProperties, {'fontsize': '16pt', 'fontweight': 'bold'}),
+    ]),
+    # Estilo para título de box
+    'box_title': ('BoxTitleStyle', 'paragraph', [
+        (TextProperties, {'fontsize': '11pt', 'fontweight': 'bold'}),
+        (ParagraphProperties, {'marginbottom': '0.2cm'}),
+    ]),
+    # Estilo para conteúdo de box
+    'box_content': ('BoxContentStyle', 'paragraph', [
+        (TextProperties, {'fontsize': '10pt'}),
+        (ParagraphProperties, {'marginbottom': '0.1cm'}),
+    ]),
+    # Estilo para célula de box (fundo cinza claro, borda)
+    'box_cell': ('BoxCellStyle', 'table-cell', [
+        (TableCellProperties, {
+            'backgroundcolor': '#f5f5f5',
+            'border': '0.03cm solid #999999',
+            'padding': '0.35cm',
+        }),
+    ]),
+    # Estilo para célula de tabela com fundo cinza (header)
+    'table_header_cell': ('TableHeaderCellStyle', 'table-cell', [
+        (TableCellProperties, {'backgroundcolor': '#e0e0e0', 'border': '0.03cm solid #999999'}),
+        (ParagraphProperties, {'padding': '0cm'}),
+        (TextProperties, {'fontweight': 'bold'}),
+    ]),
+    # Estilo para célula de tabela normal
+    'table_cell': ('TableCellStyle', 'table-cell', [
+        (TableCellProperties, {'border': '0.03cm solid #999999'}),
+        (ParagraphProperties, {'padding': '0cm'}),
+    ]),
+    # Estilo para tabela de tramitações (box)
+    'tramitacoes_table': ('TramitacoesTableStyle', 'table', [
+        (TableProperties, {'width': '100%'}),
+    ]),
+}
+
+
+def _add_cover_styles(doc) -> Dict[str, Any]:
+    """Cria os estilos da capa no documento e os retorna pela chave"""
+    styles = {}
+    for key, (name, family, properties) in _COVER_ODT_STYLES.items():
+        cover_style = Style(name=name, family=family)
+        for properties_class, attributes in properties:
+            cover_style.addElement(properties_class(**attributes))
+        doc.styles.addElement(cover_style)
+        styles[key] = cover_style
+    return styles
+
+
+def _box_paragraph(cover_styles: Dict[str, Any], text: str, label: str = None):
+    """Parágrafo de conteúdo de um quadro, com rótulo opcional em negrito"""
+    paragraph = P(stylename=cover_styles['box_content'])
+    if label:
+        span_label = Span(stylename=cover_styles['bold'])
+        span_label.addText(label)
+        paragraph.addElement(span_label)
+    paragraph.addText(text)
+    return paragraph
+
+
+def _add_box(doc, cover_styles: Dict[str, Any], title: str, elements) -> None:
+    """
+    Adiciona ao documento um quadro (tabela de 1 célula com fundo e borda)
+    com o título e os elementos informados.
+    """
+    box_table = Table()
+    box_table.addElement(TableColumn())
+    box_row = TableRow()
+    box_cell = TableCell()
+    box_cell.setAttribute("stylename", "BoxCellStyle")
+    
+    p_title = P(stylename=cover_styles['box_title'])
+    p_title.addText(title)
+    box_cell.addElement(p_title)
+    for element in elements:
+        box_cell.addElement(element)
+    
+    box_row.addElement(box_cell)
+    box_table.addElement(box_row)
+    doc.text.addElement(box_table)
+
+
 class CaseCoverODTView(LoginRequiredMixin, View):
     """
     Gera ODT da capa do processo para edição
     """
+    # Tempo (s) em que o ODT gerado fica em cache
+    cache_timeout = 3600
+    
+    def get_cache_key(self, stamp: str) -> str:
+        """Chave do ODT em cache para o estado da capa"""
+        return f'cases:cover_odt:{stamp}'
     
     def get(self, request, pk):
         """
@@ -51,10 +169,8 @@ class CaseCoverODTView(LoginRequiredMixin, View):
             )
             return redirect('cases:detail', pk=pk)
 
-        case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=pk
-        )
+        # Relações lidas no cabeçalho, no quadro de origem e nas tramitações
+        case = get_object_or_404(Case.objects.active().for_cover(), pk=pk)
         
         # Verifica se o cadastro foi finalizado
         if not case.registration_completed_at:
@@ -64,147 +180,82 @@ class CaseCoverODTView(LoginRequiredMixin, View):
             )
             return redirect('cases:detail', pk=case.pk)
         
-        # Busca dispositivos do caso
-        devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
+        filename = f'capa_processo_{case.number or case.pk}.odt'
+        
+        # ODT já gerado para este mesmo estado do processo
+        cache_key = self.get_cache_key(get_cover_stamp(case)) if settings.CASE_COVER_ODT_CACHE else None
+        if cache_key:
+            odt_content = cache.get(cache_key)
+            if odt_content is not None:
+                response = HttpResponse(odt_content, content_type='application/vnd.oasis.opendocument.text')
+                response['Content-Disposition'] = f'attachment; filename="{filename}"'
+                return response
+        
+        # Busca dispositivos do caso (materializados uma vez; o quadro usa bool, len e for)
+        devices = list(case.case_devices.filter(deleted_at__isnull=True).select_related(
             'device_category',
             'device_model__brand'
-        )
+        ))
         
         # Busca procedimentos do caso
-        procedures = case.procedures.filter(deleted_at__isnull=True).select_related(
+        procedures = list(case.procedures.filter(deleted_at__isnull=True).select_related(
             'procedure_category'
-        )
+        ))
         
         # Prepara dados para tramitações (baseado em eventos do processo)
         tramitacoes = []
         
+        # Unidade solicitante: usa a sigla se houver, senão o nome completo
+        requester_unit = case.requester_agency_unit
+        requester_unit_label = (requester_unit.acronym or requester_unit.name) if requester_unit else None
+        
         # Tramitação inicial: recebimento do processo (da delegacia para NEXT)
         if case.created_at:
-            origem_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'DM BARREIRA'
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                origem_nome = case.requester_agency_unit.acronym
             tramitacoes.append({
-                'de': origem_nome,
+                'de': requester_unit_label if requester_unit else 'DM BARREIRA',
                 'para': case.extraction_unit.acronym if case.extraction_unit else 'NEXT/COIN',
-                'data': case.created_at.strftime('%d/%m/%Y'),
-                'responsavel': case.created_by.get_full_name() if case.created_by and case.created_by.get_full_name() else (case.created_by.username if case.created_by else 'N/A')
+                'data': format_cover_date(case.created_at),
+                'responsavel': get_user_display_name(case.created_by)
             })
         
         # Tramitação: devolução/finalização (de NEXT para a delegacia)
+        destino_nome = requester_unit_label if requester_unit else 'BARREIRA'
         if case.finished_at:
-            destino_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'BARREIRA'
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                destino_nome = case.requester_agency_unit.acronym
             tramitacoes.append({
                 'de': 'NEXT',
                 'para': destino_nome,
-                'data': case.finished_at.strftime('%d/%m/%Y'),
-                'responsavel': case.finished_by.get_full_name() if case.finished_by and case.finished_by.get_full_name() else (case.finished_by.username if case.finished_by else 'N/A')
+                'data': format_cover_date(case.finished_at),
+                'responsavel': get_user_display_name(case.finished_by)
             })
         elif case.assigned_at and case.assigned_to:
-            destino_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'BARREIRA'
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                destino_nome = case.requester_agency_unit.acronym
             tramitacoes.append({
                 'de': 'NEXT',
                 'para': destino_nome,
-                'data': case.assigned_at.strftime('%d/%m/%Y'),
-                'responsavel': case.assigned_to.get_full_name() if case.assigned_to.get_full_name() else case.assigned_to.username
+                'data': format_cover_date(case.assigned_at),
+                'responsavel': get_user_display_name(case.assigned_to)
             })
         
         # Busca documentos do caso
-        documents = case.documents.filter(deleted_at__isnull=True).select_related(
+        documents = list(case.documents.filter(deleted_at__isnull=True).select_related(
             'document_category'
-        )
+        ))
         
-        # Busca todos os Ofícios de Solicitação (OFS) nos documentos
-        ofs_documents = documents.filter(
-            document_category__acronym__iexact='OFS'
-        ) if documents else []
+        # Busca todos os Ofícios de Solicitação (OFS) nos documentos já carregados
+        ofs_documents = [
+            document for document in documents
+            if document.document_category
+            and (document.document_category.acronym or '').lower() == 'ofs'
+        ]
         
         # Cria documento ODT
         try:
             doc = OpenDocumentText()
             
-            # Estilos de texto
-            bold_style = Style(name="BoldStyle", family="text")
-            bold_style.addElement(TextProperties(fontweight="bold"))
-            doc.styles.addElement(bold_style)
-            
-            # Estilo para número do documento (fundo cinza, centralizado, borda)
-            doc_number_style = Style(name="DocNumberStyle", family="paragraph")
-            doc_number_style.addElement(ParagraphProperties(
-                backgroundcolor="#d3d3d3",
-                textalign="center",
-                border="0.03cm solid #999999",
-                padding="0.28cm 0.53cm"
-            ))
-            doc_number_style.addElement(TextProperties(
-                fontsize="16pt",
-                fontweight="bold"
-            ))
-            doc.styles.addElement(doc_number_style)
-            
-            # Estilo para título de box
-            box_title_style = Style(name="BoxTitleStyle", family="paragraph")
-            box_title_style.addElement(TextProperties(
-                fontsize="11pt",
-                fontweight="bold"
-            ))
-            box_title_style.addElement(ParagraphProperties(
-                marginbottom="0.2cm"
-            ))
-            doc.styles.addElement(box_title_style)
-            
-            # Estilo para conteúdo de box
-            box_content_style = Style(name="BoxContentStyle", family="paragraph")
-            box_content_style.addElement(TextProperties(
-                fontsize="10pt"
-            ))
-            box_content_style.addElement(ParagraphProperties(
-                marginbottom="0.1cm"
-            ))
-            doc.styles.addElement(box_content_style)
-            
-            # Estilo para célula de box (fundo cinza claro, borda)
-            box_cell_style = Style(name="BoxCellStyle", family="table-cell")
-            box_cell_style.addElement(TableCellProperties(
-                backgroundcolor="#f5f5f5",
-                border="0.03cm solid #999999",
-                padding="0.35cm"
-            ))
-            doc.styles.addElement(box_cell_style)
-            
-            # Estilo para célula de tabela com fundo cinza (header)
-            table_header_cell_style = Style(name="TableHeaderCellStyle", family="table-cell")
-            table_header_cell_style.addElement(TableCellProperties(
-                backgroundcolor="#e0e0e0",
-                border="0.03cm solid #999999"
-            ))
-            table_header_cell_style.addElement(ParagraphProperties(
-                padding="0cm"
-            ))
-            table_header_cell_style.addElement(TextProperties(
-                fontweight="bold"
-            ))
-            doc.styles.addElement(table_header_cell_style)
-            
-            # Estilo para célula de tabela normal
-            table_cell_style = Style(name="TableCellStyle", family="table-cell")
-            table_cell_style.addElement(TableCellProperties(
-                border="0.03cm solid #999999"
-            ))
-            table_cell_style.addElement(ParagraphProperties(
-                padding="0cm"
-            ))
-            doc.styles.addElement(table_cell_style)
-            
-            # Estilo para tabela de tramitações (box)
-            tramitacoes_table_style = Style(name="TramitacoesTableStyle", family="table")
-            tramitacoes_table_style.addElement(TableProperties(
-                width="100%"
-            ))
-            doc.styles.addElement(tramitacoes_table_style)
+            cover_styles = _add_cover_styles(doc)
+            doc_number_style = cover_styles['doc_number']
+            table_header_cell_style = cover_styles['table_header_cell']
+            table_cell_style = cover_styles['table_cell']
+            tramitacoes_table_style = cover_styles['tramitacoes_table']
             
             # Header
             h = H(outlinelevel=1, stylename="Heading")
@@ -224,7 +275,8 @@ class CaseCoverODTView(LoginRequiredMixin, View):
             doc.text.addElement(p)
             
             # Número do documento (com estilo de box)
-            extraction_unit_acronym = case.extraction_unit.acronym if case.extraction_unit and case.extraction_unit.acronym else 'NEXT'
+            extraction_unit = case.extraction_unit
+            extraction_unit_acronym = (extraction_unit.acronym if extraction_unit else None) or 'NEXT'
             doc_number = f"{case.number or case.pk} - {extraction_unit_acronym}"
             
             p = P(stylename=doc_number_style)
@@ -232,183 +284,60 @@ class CaseCoverODTView(LoginRequiredMixin, View):
             doc.text.addElement(p)
             
             # Assunto (box) - usando tabela de 1 célula para criar o box
-            box_table = Table()
-            col = TableColumn()
-            box_table.addElement(col)
-            box_row = TableRow()
-            box_cell = TableCell()
-            box_cell.setAttribute("stylename", "BoxCellStyle")
-            
-            p_title = P(stylename=box_title_style)
-            p_title.addText("Assunto")
-            box_cell.addElement(p_title)
-            p_content = P(stylename=box_content_style)
-            p_content.addText("Extração de dados")
-            box_cell.addElement(p_content)
-            box_row.addElement(box_cell)
-            box_table.addElement(box_row)
-            doc.text.addElement(box_table)
+            _add_box(doc, cover_styles, "Assunto", [
+                _box_paragraph(cover_styles, "Extração de dados"),
+            ])
             
             # Procedimentos (box)
             if procedures:
-                box_table = Table()
-                col = TableColumn()
-                box_table.addElement(col)
-                box_row = TableRow()
-                box_cell = TableCell()
-                box_cell.setAttribute("stylename", "BoxCellStyle")
-                
-                p_title = P(stylename=box_title_style)
-                p_title.addText("Procedimentos")
-                box_cell.addElement(p_title)
-                
-                for procedure in procedures:
-                    if procedure.procedure_category:
-                        proc_text = procedure.procedure_category.name
-                        if procedure.number:
-                            proc_text += f" - {procedure.number}"
-                        p_content = P(stylename=box_content_style)
-                        p_content.addText(proc_text)
-                        box_cell.addElement(p_content)
-                
-                box_row.addElement(box_cell)
-                box_table.addElement(box_row)
-                doc.text.addElement(box_table)
+                _add_box(doc, cover_styles, "Procedimentos", [
+                    _box_paragraph(cover_styles, get_category_item_text(procedure.procedure_category, procedure.number))
+                    for procedure in procedures
+                    if procedure.procedure_category
+                ])
             
             # Documentos (box)
             if documents:
-                box_table = Table()
-                col = TableColumn()
-                box_table.addElement(col)
-                box_row = TableRow()
-                box_cell = TableCell()
-                box_cell.setAttribute("stylename", "BoxCellStyle")
-                
-                p_title = P(stylename=box_title_style)
-                p_title.addText("Documentos")
-                box_cell.addElement(p_title)
-                
-                for document in documents:
-                    if document.document_category:
-                        doc_text = document.document_category.name
-                        if document.number:
-                            doc_text += f" - {document.number}"
-                        p_content = P(stylename=box_content_style)
-                        p_content.addText(doc_text)
-                        box_cell.addElement(p_content)
-                
-                box_row.addElement(box_cell)
-                box_table.addElement(box_row)
-                doc.text.addElement(box_table)
+                _add_box(doc, cover_styles, "Documentos", [
+                    _box_paragraph(cover_styles, get_category_item_text(document.document_category, document.number))
+                    for document in documents
+                    if document.document_category
+                ])
             
             # Origem (box)
-            box_table = Table()
-            col = TableColumn()
-            box_table.addElement(col)
-            box_row = TableRow()
-            box_cell = TableCell()
-            box_cell.setAttribute("stylename", "BoxCellStyle")
-            
-            p_title = P(stylename=box_title_style)
-            p_title.addText("Origem")
-            box_cell.addElement(p_title)
-            
-            p_content = P(stylename=box_content_style)
-            span_label = Span(stylename=bold_style)
-            span_label.addText("Unidade: ")
-            p_content.addElement(span_label)
-            p_content.addText(case.requester_agency_unit.name if case.requester_agency_unit else "-")
-            box_cell.addElement(p_content)
+            origin_paragraphs = [
+                _box_paragraph(cover_styles, requester_unit.name if requester_unit else "-", label="Unidade: "),
+            ]
             
             if case.requester_reply_email:
-                p_content = P(stylename=box_content_style)
-                span_label = Span(stylename=bold_style)
-                span_label.addText("E-mail: ")
-                p_content.addElement(span_label)
-                p_content.addText(case.requester_reply_email)
-                box_cell.addElement(p_content)
+                origin_paragraphs.append(_box_paragraph(cover_styles, case.requester_reply_email, label="E-mail: "))
             
             if case.requester_authority_name:
-                p_content = P(stylename=box_content_style)
-                span_label = Span(stylename=bold_style)
-                span_label.addText("Autoridade: ")
-                p_content.addElement(span_label)
                 autoridade_text = case.requester_authority_name
                 if case.requester_authority_position:
                     autoridade_text += f" - {case.requester_authority_position.name}"
-                p_content.addText(autoridade_text)
-                box_cell.addElement(p_content)
+                origin_paragraphs.append(_box_paragraph(cover_styles, autoridade_text, label="Autoridade: "))
             
             # Ofícios
             if ofs_documents:
-                p_content = P(stylename=box_content_style)
-                span_label = Span(stylename=bold_style)
-                span_label.addText("Ofício: ")
-                p_content.addElement(span_label)
-                oficio_numbers = []
-                for ofs_doc in ofs_documents:
-                    if ofs_doc.number:
-                        oficio_numbers.append(ofs_doc.number)
-                p_content.addText(", ".join(oficio_numbers) if oficio_numbers else "-")
-                box_cell.addElement(p_content)
-            elif case.extraction_request and case.extraction_request.request_procedures:
-                p_content = P(stylename=box_content_style)
-                span_label = Span(stylename=bold_style)
-                span_label.addText("Ofício: ")
-                p_content.addElement(span_label)
-                p_content.addText(case.extraction_request.request_procedures)
-                box_cell.addElement(p_content)
+                oficio_numbers = ", ".join(ofs_doc.number for ofs_doc in ofs_documents if ofs_doc.number)
+                origin_paragraphs.append(_box_paragraph(cover_styles, oficio_numbers or "-", label="Ofício: "))
+            elif case.extraction_request_procedures:
+                origin_paragraphs.append(
+                    _box_paragraph(cover_styles, case.extraction_request_procedures, label="Ofício: ")
+                )
             
-            box_row.addElement(box_cell)
-            box_table.addElement(box_row)
-            doc.text.addElement(box_table)
+            _add_box(doc, cover_styles, "Origem", origin_paragraphs)
             
             # Aparelhos (box)
-            if devices:
-                box_table = Table()
-                col = TableColumn()
-                box_table.addElement(col)
-                box_row = TableRow()
-                box_cell = TableCell()
-                box_cell.setAttribute("stylename", "BoxCellStyle")
-                
-                p_title = P(stylename=box_title_style)
-                p_title.addText(f"Aparelhos ({len(devices)})")
-                box_cell.addElement(p_title)
-                
-                for device in devices:
-                    device_text = ""
-                    if device.device_model:
-                        device_text = f"{device.device_model.brand.name} {device.device_model.name}"
-                    else:
-                        device_text = "DISPOSITIVO"
-                    
-                    if device.color:
-                        device_text += f" - {device.color}"
-                    
-                    if device.imei_01:
-                        device_text += f" - IMEI: {device.imei_01}"
-                    
-                    p_content = P(stylename=box_content_style)
-                    p_content.addText(device_text)
-                    box_cell.addElement(p_content)
-                
-                box_row.addElement(box_cell)
-                box_table.addElement(box_row)
-                doc.text.addElement(box_table)
+            devices_count = len(devices)
+            if devices_count:
+                _add_box(doc, cover_styles, f"Aparelhos ({devices_count})", [
+                    _box_paragraph(cover_styles, get_device_cover_text(device))
+                    for device in devices
+                ])
             
             # Tramitações (box com tabela)
-            box_table = Table()
-            col = TableColumn()
-            box_table.addElement(col)
-            box_row = TableRow()
-            box_cell = TableCell()
-            box_cell.setAttribute("stylename", "BoxCellStyle")
-            
-            p_title = P(stylename=box_title_style)
-            p_title.addText("Tramitações do Processo")
-            box_cell.addElement(p_title)
-            
             # Tabela de tramitações (dentro do box)
             table = Table(stylename=tramitacoes_table_style)
             
@@ -448,40 +377,41 @@ class CaseCoverODTView(LoginRequiredMixin, View):
                     row.addElement(cell)
                 table.addElement(row)
             
-            # 5 linhas vazias
-            for i in range(5):
-                row = TableRow()
-                for j in range(4):
-                    cell = TableCell(stylename=table_cell_style)
-                    p = P()
-                    cell.addElement(p)
-                    row.addElement(cell)
-                table.addElement(row)
+            # 5 linhas vazias: uma única linha/célula repetida pelo próprio ODF
+            # (number-rows-repeated/number-columns-repeated) em vez de 20 células
+            empty_row = TableRow(numberrowsrepeated=5)
+            empty_cell = TableCell(stylename=table_cell_style, numbercolumnsrepeated=4)
+            empty_cell.addElement(P())
+            empty_row.addElement(empty_cell)
+            table.addElement(empty_row)
             
             # Adiciona a tabela dentro do box
-            box_cell.addElement(table)
-            box_row.addElement(box_cell)
-            box_table.addElement(box_row)
-            doc.text.addElement(box_table)
-            
-            # Salva em BytesIO
-            buffer = BytesIO()
-            doc.write(buffer)
-            odt_content = buffer.getvalue()
-            buffer.close()
+            _add_box(doc, cover_styles, "Tramitações do Processo", [table])
             
-            # Retorna o ODT como resposta HTTP
-            response = HttpResponse(odt_content, content_type='application/vnd.oasis.opendocument.text')
-            filename = f'capa_processo_{case.number or case.pk}.odt'
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            # Salva em BytesIO: o zip precisa de um destino com seek para que a
+            # entrada "mimetype" fique armazenada sem data descriptor (exigência do ODF)
+            with BytesIO() as buffer:
+                doc.write(buffer)
+                odt_content = buffer.getvalue()
             
+        except DatabaseError:
+            # Falha de banco não é erro de montagem do documento: segue para o tratamento padrão (500)
+            raise
         except Exception as e:
+            logger.exception('Erro ao gerar o ODT da capa do caso %s', case.pk)
             messages.error(
                 request,
                 f'Erro ao gerar o ODT da capa: {str(e)}'
             )
             return redirect('cases:detail', pk=case.pk)
+        
+        if cache_key:
+            cache.set(cache_key, odt_content, self.cache_timeout)
+        
+        # Retorna o ODT como resposta HTTP
+        response = HttpResponse(odt_content, content_type='application/vnd.oasis.opendocument.text')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class CaseDispatchGenerateView(LoginRequiredMixin, View):
@@ -498,7 +428,7 @@ class CaseDispatchGenerateView(LoginRequiredMixin, View):
         from apps.cases.models import Case
         
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
@@ -561,7 +491,7 @@ class CaseDispatchDownloadView(LoginRequiredMixin, View):
         from apps.cases.models import Case
         
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
@@ -7,17 +7,54 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView, View
 from django.utils import timezone
-from django.http import JsonResponse
-from django.template.loader import render_to_string
+from django.http import HttpResponseForbidden, JsonResponse
+from django.db.models import Exists, OuterRef
 
-from apps.cases.models import Case, CaseDevice
+from apps.cases.models import CaseDevice, Extraction
 from apps.cases.forms import CaseDeviceForm
 from apps.cases.services import CaseDeviceService
+from apps.cases.utils import get_case_devices_for_list
+from apps.cases.mixins import CaseAccessMixin
 from apps.core.services.base import ServiceException
 from apps.core.mixins.views import ServiceMixin
 
 
-class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
+# Campos do dispositivo devolvidos pelo CaseDeviceDetailView, na ordem do JSON;
+# os de texto vão como '' quando vazios, os booleanos como estão (inclusive None)
+_DEVICE_JSON_FIELDS = (
+    'color', 'is_imei_unknown',
+    'imei_01', 'imei_02', 'imei_03', 'imei_04', 'imei_05',
+    'owner_name', 'internal_storage', 'is_turned_on', 'is_locked',
+    'is_password_known', 'password_type', 'password',
+    'is_damaged', 'damage_description', 'has_fluids', 'fluids_description',
+    'has_sim_card', 'sim_card_info', 'has_memory_card', 'memory_card_info',
+    'has_other_accessories', 'other_accessories_info',
+    'is_sealed', 'security_seal', 'additional_info',
+)
+_DEVICE_JSON_TEXT_FIELDS = frozenset(
+    field for field in _DEVICE_JSON_FIELDS
+    if not field.startswith(('is_', 'has_'))
+)
+
+
+def _annotate_extractor_permission(queryset, user):
+    """
+    Anota is_device_extractor: o usuário é o extrator (ativo) da extração do
+    dispositivo. Resolve na mesma consulta do dispositivo, sem buscar o
+    ExtractorUser nem a extração separadamente.
+    """
+    return queryset.annotate(
+        is_device_extractor=Exists(
+            Extraction.objects.filter(
+                case_device=OuterRef('pk'),
+                assigned_to__user=user,
+                assigned_to__deleted_at__isnull=True
+            )
+        )
+    )
+
+
+class CaseDeviceCreateView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, CreateView):
     """
     Cria um novo dispositivo para um processo
     """
@@ -25,25 +62,9 @@ class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
     form_class = CaseDeviceForm
     service_class = CaseDeviceService
     template_name = 'cases/case_device_form.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso existe, não está deletado e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para adicionar dispositivos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para adicionar dispositivos a este processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    case_permission_denied_message = (
+        'Você não tem permissão para adicionar dispositivos a este processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_form_kwargs(self):
         """
@@ -61,14 +82,11 @@ class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
         if self.request.GET.get('from') == 'devices':
             # Recria o contexto da view CaseDevicesView
             case = self.case
-            devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
-                'device_category',
-                'device_model__brand'
-            )
+            devices = get_case_devices_for_list(case)
             
             context = {
                 'case': case,
-                'page_title': f'Processo {case.number if case.number else f"#{case.pk}"} - Dispositivos',
+                'page_title': f'Processo {case.display_number} - Dispositivos',
                 'page_icon': 'fa-mobile-alt',
                 'devices': devices,
                 'device_form': form,  # Formulário com erros
@@ -89,6 +107,10 @@ class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
         service = self.get_service()
         form_data = form.cleaned_data
         
+        # Parâmetros da requisição lidos uma vez
+        save_and_add_another = self.request.POST.get('save_and_add_another') == '1'
+        from_param = self.request.GET.get('from', '')
+        
         # Adiciona o case aos dados
         form_data['case'] = self.case
         
@@ -96,10 +118,7 @@ class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
             device = service.create(form_data)
             
             # Verifica se deve criar e adicionar outro
-            save_and_add_another = self.request.POST.get('save_and_add_another')
-            from_param = self.request.GET.get('from', '')
-            
-            if save_and_add_another == '1':
+            if save_and_add_another:
                 messages.success(
                     self.request,
                     'Dispositivo adicionado com sucesso! Você pode adicionar outro dispositivo abaixo.'
@@ -130,7 +149,7 @@ class CaseDeviceCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Processo {self.case.number if self.case.number else f"#{self.case.pk}"} - Adicionar Dispositivo'
+        context['page_title'] = f'Processo {self.case.display_number} - Adicionar Dispositivo'
         context['page_icon'] = 'fa-plus'
         context['case'] = self.case
         context['action'] = 'create'
@@ -153,43 +172,15 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         - Responsável pelo caso
         - Extrator responsável pela extração do dispositivo
         """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
+        # Dispositivo e caso em uma única consulta; reaproveitado por get_object
+        self.object = get_object_or_404(
+            _annotate_extractor_permission(self.get_queryset().select_related('case'), request.user),
+            pk=kwargs['pk']
         )
+        self.case = self.object.case
         
         # Verifica permissão: responsável pelo caso OU extrator responsável pela extração
-        has_permission = False
-        
-        # Verifica se é responsável pelo caso
-        if not self.case.assigned_to or self.case.assigned_to == request.user:
-            has_permission = True
-        
-        # Verifica se é extrator responsável pela extração deste dispositivo
-        if not has_permission:
-            try:
-                from apps.core.models import ExtractorUser
-                extractor_user = ExtractorUser.objects.get(
-                    user=request.user,
-                    deleted_at__isnull=True
-                )
-                # Verifica se há extração atribuída a este extrator para este dispositivo
-                device_pk = kwargs.get('pk')
-                if device_pk:
-                    try:
-                        device = CaseDevice.objects.get(
-                            pk=device_pk,
-                            case=self.case,
-                            deleted_at__isnull=True
-                        )
-                        if hasattr(device, 'device_extraction'):
-                            extraction = device.device_extraction
-                            if extraction.assigned_to == extractor_user:
-                                has_permission = True
-                    except CaseDevice.DoesNotExist:
-                        pass
-            except ExtractorUser.DoesNotExist:
-                pass
+        has_permission = self.case.is_editable_by(request.user) or self.object.is_device_extractor
         
         if not has_permission:
             messages.error(
@@ -202,13 +193,22 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
     
     def get_queryset(self):
         """
-        Filtra apenas dispositivos não deletados do caso
+        Filtra apenas dispositivos não deletados do caso (ativo) informado na URL
         """
         return CaseDevice.objects.filter(
-            case=self.case,
+            case_id=self.kwargs['case_pk'],
+            case__deleted_at__isnull=True,
             deleted_at__isnull=True
         )
     
+    def get_object(self, queryset=None):
+        """
+        Reaproveita o dispositivo já carregado no dispatch
+        """
+        if queryset is None and getattr(self, 'object', None) is not None:
+            return self.object
+        return super().get_object(queryset)
+    
     def get_form_kwargs(self):
         """
         Passa o caso para o formulário
@@ -234,21 +234,18 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         if self.request.GET.get('from') == 'devices':
             # Recria o contexto da view CaseDevicesView
             case = self.case
-            devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
-                'device_category',
-                'device_model__brand'
-            )
+            devices = get_case_devices_for_list(case)
             
             context = {
                 'case': case,
-                'page_title': f'Dispositivos - Processo {case.number if case.number else f"#{case.pk}"}',
+                'page_title': f'Dispositivos - Processo {case.display_number}',
                 'page_icon': 'fa-mobile-alt',
                 'devices': devices,
                 'device_form': form,  # Formulário com erros
                 'action': 'create',
                 'form_errors': form.errors,
                 'form_data': form.data,
-                'editing_device_id': self.get_object().pk
+                'editing_device_id': self.object.pk
             }
             
             return render(self.request, 'cases/case_devices.html', context)
@@ -260,7 +257,7 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Editar Dispositivo - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Editar Dispositivo - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-edit'
         context['case'] = self.case
         context['device'] = self.get_object()
@@ -274,15 +271,20 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         service = self.get_service()
         form_data = form.cleaned_data
         
+        # Lido uma vez: usado tanto no sucesso quanto no erro
+        is_ajax = self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        
         # Adiciona o case aos dados (caso não esteja no form_data)
         if 'case' not in form_data:
             form_data['case'] = self.case
         
         try:
-            device = service.update(self.get_object().pk, form_data)
+            device = service.update(
+                self.object.pk, form_data, changed_fields=form.changed_data
+            )
             
             # Se for requisição AJAX, retorna JSON
-            if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            if is_ajax:
                 return JsonResponse({
                     'success': True,
                     'message': 'Dispositivo atualizado com sucesso!',
@@ -293,17 +295,17 @@ class CaseDeviceUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
                 self.request,
                 'Dispositivo atualizado com sucesso!'
             )
-            from_param = self.request.GET.get('from', '')
-            if from_param == 'devices':
+            if self.request.GET.get('from') == 'devices':
                 return redirect('cases:devices', pk=self.case.pk)
             return redirect('cases:update', pk=self.case.pk)
         except ServiceException as e:
-            # Se for AJAX, retorna erro em JSON
-            if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            # Se for AJAX, retorna erro em JSON (o formulário já foi validado,
+            # então não há erros de campo; a mensagem do service vai em 'error')
+            if is_ajax:
                 return JsonResponse({
                     'success': False,
                     'error': str(e),
-                    'errors': form.errors
+                    'errors': {}
                 }, status=400)
             form.add_error(None, str(e))
             return self.form_invalid(form)
@@ -317,51 +319,30 @@ class CaseDeviceDetailView(LoginRequiredMixin, DetailView):
     
     def get_queryset(self):
         """
-        Filtra apenas dispositivos não deletados
+        Filtra apenas dispositivos não deletados, trazendo só as colunas
+        serializadas como dicionário (sem instanciar o modelo; categoria e
+        modelo vão apenas como id, sem JOIN)
         """
-        return CaseDevice.objects.filter(deleted_at__isnull=True).select_related(
-            'device_category',
-            'device_model__brand'
+        return CaseDevice.objects.filter(deleted_at__isnull=True).values(
+            'id', 'device_category_id', 'device_model_id', *_DEVICE_JSON_FIELDS
         )
     
     def get(self, request, *args, **kwargs):
         """
         Retorna dados do dispositivo em JSON
         """
-        device = self.get_object()
+        device = self.get_object()  # dict vindo de .values()
         
-        return JsonResponse({
-            'id': device.pk,
-            'device_category': device.device_category.pk if device.device_category else None,
-            'device_model': device.device_model.pk if device.device_model else None,
-            'color': device.color or '',
-            'is_imei_unknown': device.is_imei_unknown,
-            'imei_01': device.imei_01 or '',
-            'imei_02': device.imei_02 or '',
-            'imei_03': device.imei_03 or '',
-            'imei_04': device.imei_04 or '',
-            'imei_05': device.imei_05 or '',
-            'owner_name': device.owner_name or '',
-            'internal_storage': device.internal_storage or '',
-            'is_turned_on': device.is_turned_on,
-            'is_locked': device.is_locked,
-            'is_password_known': device.is_password_known,
-            'password_type': device.password_type or '',
-            'password': device.password or '',
-            'is_damaged': device.is_damaged,
-            'damage_description': device.damage_description or '',
-            'has_fluids': device.has_fluids,
-            'fluids_description': device.fluids_description or '',
-            'has_sim_card': device.has_sim_card,
-            'sim_card_info': device.sim_card_info or '',
-            'has_memory_card': device.has_memory_card,
-            'memory_card_info': device.memory_card_info or '',
-            'has_other_accessories': device.has_other_accessories,
-            'other_accessories_info': device.other_accessories_info or '',
-            'is_sealed': device.is_sealed,
-            'security_seal': device.security_seal or '',
-            'additional_info': device.additional_info or '',
-        })
+        data = {
+            'id': device['id'],
+            'device_category': device['device_category_id'],
+            'device_model': device['device_model_id'],
+        }
+        for field in _DEVICE_JSON_FIELDS:
+            value = device[field]
+            data[field] = (value or '') if field in _DEVICE_JSON_TEXT_FIELDS else value
+        
+        return JsonResponse(data)
 
 
 class CaseDeviceFormModalView(LoginRequiredMixin, View):
@@ -372,111 +353,91 @@ class CaseDeviceFormModalView(LoginRequiredMixin, View):
     - Extrator responsável pela extração do dispositivo
     """
     def get(self, request, case_pk, pk):
-        case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=case_pk
-        )
-        
+        # Dispositivo e caso em uma única consulta
         device = get_object_or_404(
-            CaseDevice.objects.filter(case=case, deleted_at__isnull=True),
+            _annotate_extractor_permission(
+                CaseDevice.objects.select_related('case').filter(
+                    case_id=case_pk,
+                    case__deleted_at__isnull=True,
+                    deleted_at__isnull=True
+                ),
+                request.user
+            ),
             pk=pk
         )
+        case = device.case
         
         # Verifica permissão: responsável pelo caso OU extrator responsável pela extração
-        has_permission = False
-        
-        # Verifica se é responsável pelo caso
-        if not case.assigned_to or case.assigned_to == request.user:
-            has_permission = True
-        
-        # Verifica se é extrator responsável pela extração deste dispositivo
-        if not has_permission:
-            try:
-                from apps.core.models import ExtractorUser
-                extractor_user = ExtractorUser.objects.get(
-                    user=request.user,
-                    deleted_at__isnull=True
-                )
-                # Verifica se há extração atribuída a este extrator para este dispositivo
-                if hasattr(device, 'device_extraction'):
-                    extraction = device.device_extraction
-                    if extraction.assigned_to == extractor_user:
-                        has_permission = True
-            except ExtractorUser.DoesNotExist:
-                pass
+        has_permission = case.is_editable_by(request.user) or device.is_device_extractor
         
         if not has_permission:
-            return JsonResponse({
-                'success': False,
-                'error': 'Você não tem permissão para editar dispositivos deste processo.'
-            }, status=403)
+            return HttpResponseForbidden(
+                'Você não tem permissão para editar dispositivos deste processo.'
+            )
         
         form = CaseDeviceForm(instance=device, case=case)
         
         # Verifica se é extrator editando (não responsável pelo caso)
-        is_extractor_editing = False
-        if case.assigned_to and case.assigned_to != request.user:
-            is_extractor_editing = True
+        is_extractor_editing = not case.is_editable_by(request.user)
         
-        # Renderiza apenas o formulário
-        form_html = render_to_string('cases/includes/device_form_modal.html', {
+        # Renderiza apenas o formulário, devolvido como HTML (sem envelope JSON)
+        return render(request, 'cases/includes/device_form_modal.html', {
             'form': form,
             'device': device,
             'case': case,
             'is_extractor_editing': is_extractor_editing
-        }, request=request)
-        
-        return JsonResponse({
-            'success': True,
-            'html': form_html
         })
 
 
-class CaseDeviceDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
+class CaseDeviceDeleteView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, DeleteView):
     """
     Realiza soft delete de um dispositivo
     """
     model = CaseDevice
     service_class = CaseDeviceService
     template_name = 'cases/case_device_confirm_delete.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso e o dispositivo existem, não estão deletados e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para excluir dispositivos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para excluir dispositivos deste processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    context_object_name = 'device'
+    case_permission_denied_message = (
+        'Você não tem permissão para excluir dispositivos deste processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_queryset(self):
         """
         Filtra apenas dispositivos não deletados do caso
         """
-        return CaseDevice.objects.filter(
+        queryset = CaseDevice.objects.filter(
             case=self.case,
             deleted_at__isnull=True
-        ).select_related(
+        )
+        
+        # O POST (inclusive AJAX) só precisa confirmar que o dispositivo pertence ao caso;
+        # categoria e modelo são carregados apenas para a página de confirmação
+        if self.request.method != 'GET':
+            return queryset.only('pk', 'case_id')
+        
+        # Só as colunas exibidas em case_device_confirm_delete.html
+        return queryset.select_related(
             'device_category',
             'device_model__brand'
+        ).only(
+            'case_id', 'color', 'is_imei_unknown', 'imei_01', 'owner_name', 'created_at',
+            'device_category__name',
+            'device_model__name',
+            'device_model__brand__name',
         )
     
+    def form_valid(self, form):
+        """
+        DeleteView.post chama form_valid; direciona para o soft delete
+        """
+        return self.delete(self.request, *self.args, **self.kwargs)
+    
     def delete(self, request, *args, **kwargs):
         """
         Realiza soft delete usando service e suporta requisições AJAX
         """
         service = self.get_service()
-        device_pk = self.get_object().pk
+        device_pk = self.object.pk if getattr(self, 'object', None) else self.get_object().pk
         
         try:
             service.delete(device_pk)
@@ -502,7 +463,7 @@ class CaseDeviceDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Excluir Dispositivo - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Excluir Dispositivo - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-trash'
         context['case'] = self.case
         return context
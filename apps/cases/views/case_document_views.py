@@ -1,7 +1,7 @@
 """
 Views relacionadas ao modelo CaseDocument
 """
-from django.shortcuts import redirect, get_object_or_404, render
+from django.shortcuts import redirect, render
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
@@ -9,14 +9,15 @@ from django.utils import timezone
 from django.http import JsonResponse
 from django.urls import reverse
 
-from apps.cases.models import Case, CaseDocument
+from apps.cases.models import CaseDocument
 from apps.cases.forms import CaseDocumentForm
 from apps.cases.services import CaseDocumentService
+from apps.cases.mixins import CaseAccessMixin
 from apps.core.services.base import ServiceException
 from apps.core.mixins.views import ServiceMixin
 
 
-class CaseDocumentCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
+class CaseDocumentCreateView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, CreateView):
     """
     Cria um novo documento para um processo
     """
@@ -24,25 +25,9 @@ class CaseDocumentCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
     form_class = CaseDocumentForm
     service_class = CaseDocumentService
     template_name = 'cases/case_document_form.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso existe, não está deletado e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para adicionar documentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para adicionar documentos a este processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    case_permission_denied_message = (
+        'Você não tem permissão para adicionar documentos a este processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_form_kwargs(self):
         """
@@ -64,7 +49,7 @@ class CaseDocumentCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
             
             context = {
                 'case': case,
-                'page_title': f'Processo {case.number if case.number else f"#{case.pk}"} - Documentos',
+                'page_title': f'Processo {case.display_number} - Documentos',
                 'page_icon': 'fa-file-alt',
                 'documents': documents,
                 'document_form': form,  # Formulário com erros
@@ -104,7 +89,7 @@ class CaseDocumentCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Adicionar Documento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Adicionar Documento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-plus'
         context['case'] = self.case
         context['action'] = 'create'
@@ -137,7 +122,7 @@ class CaseDocumentDetailView(LoginRequiredMixin, DetailView):
         })
 
 
-class CaseDocumentUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
+class CaseDocumentUpdateView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, UpdateView):
     """
     Atualiza um documento existente
     """
@@ -145,25 +130,9 @@ class CaseDocumentUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
     form_class = CaseDocumentForm
     service_class = CaseDocumentService
     template_name = 'cases/case_document_form.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso e o documento existem, não estão deletados e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para editar documentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para editar documentos deste processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    case_permission_denied_message = (
+        'Você não tem permissão para editar documentos deste processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_queryset(self):
         """
@@ -194,7 +163,7 @@ class CaseDocumentUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
             
             context = {
                 'case': case,
-                'page_title': f'Processo {case.number if case.number else f"#{case.pk}"} - Documentos',
+                'page_title': f'Processo {case.display_number} - Documentos',
                 'page_icon': 'fa-file-alt',
                 'documents': documents,
                 'document_form': form,  # Formulário com erros
@@ -242,7 +211,7 @@ class CaseDocumentUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Editar Documento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Editar Documento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-edit'
         context['case'] = self.case
         context['document'] = self.get_object()
@@ -250,39 +219,28 @@ class CaseDocumentUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         return context
 
 
-class CaseDocumentDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
+class CaseDocumentDeleteView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, DeleteView):
     """
     Realiza soft delete de um documento
     """
     model = CaseDocument
     service_class = CaseDocumentService
     template_name = 'cases/case_document_confirm_delete.html'
+    case_permission_denied_message = (
+        'Você não tem permissão para excluir documentos deste processo. Apenas o responsável pode fazer isso.'
+    )
     
-    def dispatch(self, request, *args, **kwargs):
+    def handle_case_permission_denied(self, request):
         """
-        Verifica se o caso e o documento existem, não estão deletados e se o usuário tem permissão
+        Mantém a mensagem e o redirecionamento; se for AJAX, retorna JSON
         """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para excluir documentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para excluir documentos deste processo. Apenas o responsável pode fazer isso.'
-            )
-            # Se for AJAX, retorna JSON
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or \
-               request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Você não tem permissão para excluir documentos deste processo.'
-                }, status=403)
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+        response = super().handle_case_permission_denied(request)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': 'Você não tem permissão para excluir documentos deste processo.'
+            }, status=403)
+        return response
     
     def get_queryset(self):
         """
@@ -347,7 +305,7 @@ class CaseDocumentDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Excluir Documento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Excluir Documento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-trash'
         context['case'] = self.case
         return context
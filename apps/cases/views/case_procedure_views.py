@@ -1,7 +1,7 @@
 """
 Views relacionadas ao modelo CaseProcedure
 """
-from django.shortcuts import redirect, get_object_or_404, render
+from django.shortcuts import redirect, render
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
@@ -9,14 +9,15 @@ from django.utils import timezone
 from django.http import JsonResponse
 from django.urls import reverse
 
-from apps.cases.models import Case, CaseProcedure
+from apps.cases.models import CaseProcedure
 from apps.cases.forms import CaseProcedureForm
 from apps.cases.services import CaseProcedureService
+from apps.cases.mixins import CaseAccessMixin
 from apps.core.services.base import ServiceException
 from apps.core.mixins.views import ServiceMixin
 
 
-class CaseProcedureCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
+class CaseProcedureCreateView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, CreateView):
     """
     Cria um novo procedimento para um processo
     """
@@ -24,25 +25,9 @@ class CaseProcedureCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
     form_class = CaseProcedureForm
     service_class = CaseProcedureService
     template_name = 'cases/case_procedure_form.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso existe, não está deletado e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para adicionar procedimentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para adicionar procedimentos a este processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    case_permission_denied_message = (
+        'Você não tem permissão para adicionar procedimentos a este processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_form_kwargs(self):
         """
@@ -68,7 +53,7 @@ class CaseProcedureCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
             
             context = {
                 'case': case,
-                'page_title': f'Processo {case.number if case.number else f"#{case.pk}"} - Procedimentos',
+                'page_title': f'Processo {case.display_number} - Procedimentos',
                 'page_icon': 'fa-gavel',
                 'procedures': procedures,
                 'devices': devices,
@@ -114,7 +99,7 @@ class CaseProcedureCreateView(LoginRequiredMixin, ServiceMixin, CreateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Adicionar Procedimento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Adicionar Procedimento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-plus'
         context['case'] = self.case
         context['action'] = 'create'
@@ -147,7 +132,7 @@ class CaseProcedureDetailView(LoginRequiredMixin, DetailView):
         })
 
 
-class CaseProcedureUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
+class CaseProcedureUpdateView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, UpdateView):
     """
     Atualiza um procedimento existente
     """
@@ -155,25 +140,9 @@ class CaseProcedureUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
     form_class = CaseProcedureForm
     service_class = CaseProcedureService
     template_name = 'cases/case_procedure_form.html'
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Verifica se o caso e o procedimento existem, não estão deletados e se o usuário tem permissão
-        """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para editar procedimentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para editar procedimentos deste processo. Apenas o responsável pode fazer isso.'
-            )
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+    case_permission_denied_message = (
+        'Você não tem permissão para editar procedimentos deste processo. Apenas o responsável pode fazer isso.'
+    )
     
     def get_queryset(self):
         """
@@ -208,7 +177,7 @@ class CaseProcedureUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
             
             context = {
                 'case': case,
-                'page_title': f'Processo {case.number if case.number else f"#{case.pk}"} - Procedimentos',
+                'page_title': f'Processo {case.display_number} - Procedimentos',
                 'page_icon': 'fa-gavel',
                 'procedures': procedures,
                 'devices': devices,
@@ -263,7 +232,7 @@ class CaseProcedureUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Editar Procedimento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Editar Procedimento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-edit'
         context['case'] = self.case
         context['procedure'] = self.get_object()
@@ -271,39 +240,28 @@ class CaseProcedureUpdateView(LoginRequiredMixin, ServiceMixin, UpdateView):
         return context
 
 
-class CaseProcedureDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
+class CaseProcedureDeleteView(LoginRequiredMixin, CaseAccessMixin, ServiceMixin, DeleteView):
     """
     Realiza soft delete de um procedimento
     """
     model = CaseProcedure
     service_class = CaseProcedureService
     template_name = 'cases/case_procedure_confirm_delete.html'
+    case_permission_denied_message = (
+        'Você não tem permissão para excluir procedimentos deste processo. Apenas o responsável pode fazer isso.'
+    )
     
-    def dispatch(self, request, *args, **kwargs):
+    def handle_case_permission_denied(self, request):
         """
-        Verifica se o caso e o procedimento existem, não estão deletados e se o usuário tem permissão
+        Mantém a mensagem e o redirecionamento; se for AJAX, retorna JSON
         """
-        self.case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=kwargs['case_pk']
-        )
-        
-        # Verifica se o usuário tem permissão para excluir procedimentos
-        if self.case.assigned_to and self.case.assigned_to != request.user:
-            messages.error(
-                request,
-                'Você não tem permissão para excluir procedimentos deste processo. Apenas o responsável pode fazer isso.'
-            )
-            # Se for AJAX, retorna JSON
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or \
-               request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Você não tem permissão para excluir procedimentos deste processo.'
-                }, status=403)
-            return redirect('cases:update', pk=self.case.pk)
-        
-        return super().dispatch(request, *args, **kwargs)
+        response = super().handle_case_permission_denied(request)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': 'Você não tem permissão para excluir procedimentos deste processo.'
+            }, status=403)
+        return response
     
     def get_queryset(self):
         """
@@ -368,7 +326,7 @@ class CaseProcedureDeleteView(LoginRequiredMixin, ServiceMixin, DeleteView):
         Adiciona informações de página ao contexto
         """
         context = super().get_context_data(**kwargs)
-        context['page_title'] = f'Excluir Procedimento - Processo {self.case.number if self.case.number else f"#{self.case.pk}"}'
+        context['page_title'] = f'Excluir Procedimento - Processo {self.case.display_number}'
         context['page_icon'] = 'fa-trash'
         context['case'] = self.case
         return context
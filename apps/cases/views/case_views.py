@@ -9,20 +9,20 @@ from django.utils import timezone
 from django.http import JsonResponse, HttpResponse
 from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.http import url_has_allowed_host_and_scheme
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from django.utils.functional import cached_property
+from django.core.paginator import Paginator
+import time
 from io import BytesIO
-from typing import Dict, Any
-from django.db.models import QuerySet
+from functools import lru_cache
+from typing import Dict, Any, Tuple
+from django.db.models import QuerySet, Prefetch, prefetch_related_objects
 
 from apps.core.mixins.views import (
     BaseDetailView, BaseCreateView, BaseUpdateView, 
-    BaseDeleteView, ServiceMixin, ExtractionUnitFilterMixin
+    BaseDeleteView, ServiceMixin, ExtractionUnitFilterMixin, CachedObjectMixin
 )
 from apps.cases.models import Case, CaseDevice, Extraction, CaseProcedure, CaseDocument
 from apps.cases.forms import (
@@ -32,41 +32,123 @@ from apps.cases.forms import (
 )
 from apps.core.models import ReportsSettings
 from apps.cases.services import CaseService
+from apps.cases.utils import (
+    format_cover_date, get_case_devices_for_list, get_case_list_cache_version,
+    get_category_item_text, get_cover_stamp, get_device_cover_text, get_device_model_label,
+    get_user_display_name
+)
 from apps.core.services.base import ServiceException
 
 
-class CaseListView(ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceMixin, ListView):
+class CaseSearchFormMixin:
+    """
+    Mantém uma única instância validada do formulário de busca por requisição,
+    compartilhada entre get_queryset (filtros) e get_context_data.
+    """
+    search_form_class = CaseSearchForm
+    
+    def get_search_form(self):
+        """Return the search form bound to the request, built only once"""
+        if not hasattr(self, '_search_form'):
+            self._search_form = self.search_form_class(self.request.GET or None)
+        return self._search_form
+    
+    def get_filters(self) -> Dict[str, Any]:
+        """Get filters from request"""
+        # Sem parâmetros na URL não há filtro a validar
+        if not self.request.GET:
+            return {}
+        # is_valid() reaproveita os erros já calculados na primeira chamada
+        form = self.get_search_form()
+        filters = form.cleaned_data if form.is_valid() else {}
+        return {k: v for k, v in filters.items() if v}
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginator com o total já conhecido (ex.: guardado em cache), sem COUNT(*)
+    """
+    
+    def __init__(self, *args, count: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._known_count = count
+    
+    @cached_property
+    def count(self) -> int:
+        return self._known_count
+
+
+class CaseListView(CaseSearchFormMixin, ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceMixin, ListView):
     """
     Lista todos os processos de extração com filtros
     """
     model = Case
     service_class = CaseService
-    search_form_class = CaseSearchForm
     template_name = 'cases/case_list.html'
     context_object_name = 'cases'
     paginate_by = settings.PAGINATE_BY
     
+    def get_service(self) -> CaseService:
+        """Um único service por requisição (as unidades visíveis ficam memorizadas nele)"""
+        if not hasattr(self, '_service'):
+            self._service = super().get_service()
+        return self._service
+    
     def get_queryset(self) -> QuerySet:
         """Get filtered queryset using service"""
         service = self.get_service()
         filters = self.get_filters()
         
         try:
-            return service.list_filtered(filters)
+            return service.get_list_queryset(filters)
         except ServiceException as e:
             self.handle_service_exception(e)
             return self.model.objects.none()
     
-    def get_filters(self) -> Dict[str, Any]:
-        """Get filters from request"""
-        filters = {}
-        
-        if self.search_form_class:
-            form = self.search_form_class(self.request.GET or None)
-            if form.is_valid():
-                filters = form.cleaned_data
-                
-        return {k: v for k, v in filters.items() if v}
+    # Tempo (s) em que a primeira página sem filtros fica em cache
+    landing_cache_timeout = 30
+    
+    def get_landing_cache_key(self) -> str:
+        """
+        Chave da primeira página sem filtros: pelas unidades de extração visíveis
+        (compartilhada entre usuários com o mesmo escopo e trocada quando os
+        vínculos do extrator mudam) e pela versão da listagem
+        """
+        unit_ids = self.get_service().get_visible_extraction_unit_ids()
+        scope = 'all' if unit_ids is None else 'units:' + ','.join(map(str, unit_ids))
+        return f'cases:list:landing:{scope}:{get_case_list_cache_version()}'
+    
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Na abertura da listagem (sem filtros nem página), reaproveita os ids e o
+        total da primeira página guardados em cache, evitando o COUNT e a
+        ordenação sobre toda a tabela; as linhas são carregadas por chave primária.
+        """
+        if self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        
+        cache_key = self.get_landing_cache_key()
+        cached = cache.get(cache_key)
+        if cached is None:
+            paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+            cache.set(
+                cache_key,
+                ([case.pk for case in page.object_list], paginator.count),
+                self.landing_cache_timeout
+            )
+            return paginator, page, object_list, is_paginated
+        
+        ids, count = cached
+        paginator = KnownCountPaginator(
+            queryset, page_size,
+            count=count,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        cases = queryset.in_bulk(ids)
+        page = paginator.page(1)
+        page.object_list = [cases[pk] for pk in ids if pk in cases]
+        return paginator, page, page.object_list, page.has_other_pages()
     
     def get_context_data(self, **kwargs):
         """Add search form and total count to context"""
@@ -74,21 +156,20 @@ class CaseListView(ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceMixin,
         context['page_title'] = 'Processos de Extração'
         context['page_icon'] = 'fa-folder-open'
         context['page_description'] = 'Gerencie todos os processos de extração'
-        context['form'] = self.search_form_class(self.request.GET or None)
-        context['total_count'] = self.get_queryset().count()
+        context['form'] = self.get_search_form()
+        context['total_count'] = context['paginator'].count
         context['list_url'] = reverse('cases:list')
         context['clear_url'] = context['list_url']
         return context
 
 
-class CaseWaitingExtractorListView(ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceMixin, ListView):
+class CaseWaitingExtractorListView(CaseSearchFormMixin, ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceMixin, ListView):
     """
     Lista processos aguardando extrator (assigned_to é nulo),
     mantendo os demais filtros disponíveis.
     """
     model = Case
     service_class = CaseService
-    search_form_class = CaseSearchForm
     template_name = 'cases/case_waiting_extractor_list.html'
     context_object_name = 'cases'
     paginate_by = settings.PAGINATE_BY
@@ -99,7 +180,7 @@ class CaseWaitingExtractorListView(ExtractionUnitFilterMixin, LoginRequiredMixin
         filters = self.get_filters()
         
         try:
-            queryset = service.list_filtered(filters)
+            queryset = service.get_list_queryset(filters)
             # Filtra apenas processos sem atribuição (assigned_to é nulo)
             queryset = queryset.filter(assigned_to__isnull=True)
             return queryset
@@ -107,25 +188,14 @@ class CaseWaitingExtractorListView(ExtractionUnitFilterMixin, LoginRequiredMixin
             self.handle_service_exception(e)
             return self.model.objects.none()
     
-    def get_filters(self) -> Dict[str, Any]:
-        """Get filters from request"""
-        filters = {}
-        
-        if self.search_form_class:
-            form = self.search_form_class(self.request.GET or None)
-            if form.is_valid():
-                filters = form.cleaned_data
-                
-        return {k: v for k, v in filters.items() if v}
-    
     def get_context_data(self, **kwargs):
         """Add search form and total count to context"""
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Processos - Aguardando Extrator'
         context['page_icon'] = 'fa-user-clock'
         context['page_description'] = 'Processos aguardando atribuição de extrator'
-        context['form'] = self.search_form_class(self.request.GET or None)
-        context['total_count'] = self.get_queryset().count()
+        context['form'] = self.get_search_form()
+        context['total_count'] = context['paginator'].count
         context['list_url'] = reverse('cases:waiting_extractor_list')
         context['clear_url'] = context['list_url']
 
@@ -144,16 +214,16 @@ class CaseDetailView(ExtractionUnitFilterMixin, BaseDetailView):
     def get_context_data(self, **kwargs):
         """Add page information and counts to context"""
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
-        case_number = case.number if case.number else f"#{case.pk}"
+        case = self.object
+        case_number = case.display_number
         acronym = f" - {case.requester_agency_unit.acronym}" if case.requester_agency_unit and case.requester_agency_unit.acronym else ""
         context['page_title'] = f'Processo {case_number}{acronym}'
         context['page_icon'] = 'fa-briefcase'
         
         # Add device, procedure and document counts for complete registration button
-        context['devices_count'] = case.case_devices.filter(deleted_at__isnull=True).count()
-        context['procedures_count'] = case.procedures.filter(deleted_at__isnull=True).count()
-        context['documents_count'] = case.documents.filter(deleted_at__isnull=True).count()
+        context.update(self.get_service().get_related_counts(case))
+        
+        context['case_notes'] = case.notes.filter(deleted_at__isnull=True).select_related('created_by')
         
         # Add extractions count and list
         extractions = Extraction.objects.filter(
@@ -167,16 +237,20 @@ class CaseDetailView(ExtractionUnitFilterMixin, BaseDetailView):
             'assigned_to',
             'assigned_to__user',
             'started_by',
-            'started_by__user'
+            'started_by__user',
+            'finished_by',
+            'finished_by__user'
         ).order_by('-created_at')
         
-        context['extractions_count'] = extractions.count()
+        # Avalia a lista uma única vez; contagens e status são derivados dela
+        extractions = list(extractions)
+        context['extractions_count'] = len(extractions)
         context['extractions'] = extractions
         
         # Check if all extractions are completed
-        total_extractions = extractions.count()
-        completed_extractions = extractions.filter(status=Extraction.STATUS_COMPLETED).count()
-        context['all_extractions_completed'] = total_extractions > 0 and completed_extractions == total_extractions
+        context['all_extractions_completed'] = bool(extractions) and all(
+            extraction.status == Extraction.STATUS_COMPLETED for extraction in extractions
+        )
         
         return context
 
@@ -193,16 +267,14 @@ class CaseHubView(ExtractionUnitFilterMixin, BaseDetailView):
     def get_context_data(self, **kwargs):
         """Add page information and counts to context"""
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
-        case_number = case.number if case.number else f"#{case.pk}"
+        case = self.object
+        case_number = case.display_number
         acronym = f" - {case.requester_agency_unit.acronym}" if case.requester_agency_unit and case.requester_agency_unit.acronym else ""
         context['page_title'] = f'Hub de Ações - Processo {case_number}{acronym}'
         context['page_icon'] = 'fa-th'
         
         # Add device, procedure and document counts
-        context['devices_count'] = case.case_devices.filter(deleted_at__isnull=True).count()
-        context['procedures_count'] = case.procedures.filter(deleted_at__isnull=True).count()
-        context['documents_count'] = case.documents.filter(deleted_at__isnull=True).count()
+        context.update(self.get_service().get_related_counts(case))
         
         # Add extractions count
         context['extractions_count'] = Extraction.objects.filter(
@@ -234,26 +306,33 @@ class CaseCreateView(BaseCreateView):
         extraction_request_id = self.request.GET.get('extraction_request')
         
         if extraction_request_id:
+            from apps.requisitions.models import ExtractionRequest
+            # Apenas as colunas copiadas; os selects aceitam o id das FKs como valor inicial
+            fields = {
+                'requester_agency_unit': 'requester_agency_unit_id',
+                'request_procedures': 'request_procedures',
+                'crime_category': 'crime_category_id',
+                'requested_device_amount': 'requested_device_amount',
+                'requester_reply_email': 'requester_reply_email',
+                'requester_authority_name': 'requester_authority_name',
+                'requester_authority_position': 'requester_authority_position_id',
+                'extraction_unit': 'extraction_unit_id',
+                'additional_info': 'additional_info',
+            }
             try:
-                from apps.requisitions.models import ExtractionRequest
-                extraction_request = ExtractionRequest.objects.get(
+                extraction_request = ExtractionRequest.objects.filter(
                     pk=extraction_request_id,
                     deleted_at__isnull=True,
                     case__isnull=True
-                )
+                ).values(*fields.values()).first()
+            except ValueError:
+                # Id inválido na querystring
+                extraction_request = None
+            
+            if extraction_request:
                 initial.update({
-                    'requester_agency_unit': extraction_request.requester_agency_unit,
-                    'request_procedures': extraction_request.request_procedures,
-                    'crime_category': extraction_request.crime_category,
-                    'requested_device_amount': extraction_request.requested_device_amount,
-                    'requester_reply_email': extraction_request.requester_reply_email,
-                    'requester_authority_name': extraction_request.requester_authority_name,
-                    'requester_authority_position': extraction_request.requester_authority_position,
-                    'extraction_unit': extraction_request.extraction_unit,
-                    'additional_info': extraction_request.additional_info,
+                    field: extraction_request[column] for field, column in fields.items()
                 })
-            except:
-                pass
         
         return initial
     
@@ -283,7 +362,7 @@ class CaseCreateView(BaseCreateView):
         return context
 
 
-class CaseUpdateView(ExtractionUnitFilterMixin, BaseUpdateView):
+class CaseUpdateView(CachedObjectMixin, ExtractionUnitFilterMixin, BaseUpdateView):
     """
     Atualiza um processo de extração existente
     """
@@ -292,25 +371,12 @@ class CaseUpdateView(ExtractionUnitFilterMixin, BaseUpdateView):
     service_class = CaseService
     template_name = 'cases/case_form_update.html'
     
-    def get_queryset(self):
-        """Filter non-deleted cases and prefetch procedures and devices"""
-        queryset = Case.objects.filter(
-            deleted_at__isnull=True
-        ).prefetch_related(
-            'procedures__procedure_category',
-            'documents__document_category',
-            'case_devices__device_category',
-            'case_devices__device_model__brand'
-        )
-        # Aplica filtro de extraction_unit via mixin
-        return super().get_queryset() if hasattr(super(), 'get_queryset') else queryset
-    
     def dispatch(self, request, *args, **kwargs):
         """Check if user has permission to edit the case"""
         case = self.get_object()
         
         # Allow editing if user is assigned or case has no assignee
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para editar este processo. Apenas o responsável pode editá-lo.'
@@ -343,31 +409,13 @@ class CaseUpdateView(ExtractionUnitFilterMixin, BaseUpdateView):
             return self.form_invalid(form)
     
     def get_context_data(self, **kwargs):
-        """Add page information and counts to context"""
+        """Add page information to context"""
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
-        context['page_title'] = f'Editar Processo {case.number if case.number else f"#{case.pk}"}'
+        case = self.object
+        context['page_title'] = f'Editar Processo {case.display_number}'
         context['page_icon'] = 'fa-edit'
         context['case'] = case
         context['action'] = 'update'
-        
-        # Add counts for complete registration button
-        context['devices_count'] = case.case_devices.filter(deleted_at__isnull=True).count()
-        context['procedures_count'] = case.procedures.filter(deleted_at__isnull=True).count()
-        context['documents_count'] = case.documents.filter(deleted_at__isnull=True).count()
-        
-        # Add procedures to context for the template
-        context['procedures'] = case.procedures.filter(deleted_at__isnull=True).select_related('procedure_category')
-        
-        # Add documents to context for the template
-        context['documents'] = case.documents.filter(deleted_at__isnull=True).select_related('document_category')
-        
-        # Add devices to context for the template
-        context['devices'] = case.case_devices.filter(deleted_at__isnull=True).select_related(
-            'device_category',
-            'device_model__brand'
-        )
-        
         return context
 
 class CaseUpdateFullView(CaseUpdateView):
@@ -382,7 +430,49 @@ class CaseUpdateFullView(CaseUpdateView):
         kwargs['user'] = self.request.user
         return kwargs
 
-class CaseDeleteView(BaseDeleteView):
+    def get_context_data(self, **kwargs):
+        """Add procedures, documents, devices and their counts to context"""
+        context = super().get_context_data(**kwargs)
+        case = self.object
+        
+        # Carrega procedimentos, documentos e dispositivos ativos em uma consulta por relação
+        prefetch_related_objects(
+            [case],
+            Prefetch(
+                'procedures',
+                queryset=CaseProcedure.objects.filter(
+                    deleted_at__isnull=True
+                ).select_related('procedure_category'),
+                to_attr='active_procedures'
+            ),
+            Prefetch(
+                'documents',
+                queryset=CaseDocument.objects.filter(
+                    deleted_at__isnull=True
+                ).select_related('document_category'),
+                to_attr='active_documents'
+            ),
+            Prefetch(
+                'case_devices',
+                queryset=CaseDevice.objects.filter(
+                    deleted_at__isnull=True
+                ).select_related('device_category', 'device_model__brand'),
+                to_attr='active_devices'
+            ),
+        )
+        
+        context['procedures'] = case.active_procedures
+        context['documents'] = case.active_documents
+        context['devices'] = case.active_devices
+        
+        # Add counts for complete registration button
+        context['procedures_count'] = len(case.active_procedures)
+        context['documents_count'] = len(case.active_documents)
+        context['devices_count'] = len(case.active_devices)
+        
+        return context
+
+class CaseDeleteView(CachedObjectMixin, BaseDeleteView):
     """
     Realiza soft delete de um processo de extração
     """
@@ -400,7 +490,7 @@ class CaseDeleteView(BaseDeleteView):
         case = self.get_object()
         
         # Allow deletion only if user is assigned or case has no assignee
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para excluir este processo. Apenas o responsável pode excluí-lo.'
@@ -412,8 +502,8 @@ class CaseDeleteView(BaseDeleteView):
     def get_context_data(self, **kwargs):
         """Add page information to context"""
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
-        context['page_title'] = f'Excluir Processo {case.number if case.number else f"#{case.pk}"}'
+        case = self.object
+        context['page_title'] = f'Excluir Processo {case.display_number}'
         context['page_icon'] = 'fa-trash'
         return context
 
@@ -430,12 +520,12 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
         Exibe o formulário de finalização de cadastro
         """
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
         # Verifica se o usuário tem permissão
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para finalizar o cadastro deste processo. Apenas o responsável pode fazer isso.'
@@ -450,9 +540,10 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
             )
             return redirect('cases:detail', pk=case.pk)
         
+        counts = self.get_service().get_related_counts(case)
+        
         # Verifica se há dispositivos cadastrados
-        devices_count = case.case_devices.filter(deleted_at__isnull=True).count()
-        if devices_count == 0:
+        if counts['devices_count'] == 0:
             messages.error(
                 request,
                 'É necessário cadastrar pelo menos um dispositivo antes de finalizar o cadastro do processo.'
@@ -460,31 +551,24 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
             return redirect('cases:update', pk=case.pk)
         
         # Verifica se há procedimentos cadastrados
-        procedures_count = case.procedures.filter(deleted_at__isnull=True).count()
-        if procedures_count == 0:
+        if counts['procedures_count'] == 0:
             messages.error(
                 request,
                 'É necessário cadastrar pelo menos um procedimento antes de finalizar o cadastro do processo.'
             )
             return redirect('cases:detail', pk=case.pk)
         
-        # Verifica quantos dispositivos não têm extração
-        devices_without_extraction = case.case_devices.filter(
-            deleted_at__isnull=True,
-            device_extraction__isnull=True
-        ).count()
-        
         form = CaseCompleteRegistrationForm(initial={
-            'create_extractions': devices_without_extraction > 0
+            'create_extractions': counts['devices_without_extraction'] > 0
         })
         
         return render(request, self.template_name, {
             'case': case,
             'form': form,
-            'devices_count': devices_count,
-            'procedures_count': procedures_count,
-            'devices_without_extraction': devices_without_extraction,
-            'page_title': f'Finalizar Cadastro - Processo {case.number if case.number else f"#{case.pk}"}',
+            'devices_count': counts['devices_count'],
+            'procedures_count': counts['procedures_count'],
+            'devices_without_extraction': counts['devices_without_extraction'],
+            'page_title': f'Finalizar Cadastro - Processo {case.display_number}',
             'page_icon': 'fa-check-circle',
         })
     
@@ -493,12 +577,12 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
         Processa a finalização do cadastro
         """
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
         # Verifica se o usuário tem permissão
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para finalizar o cadastro deste processo.'
@@ -513,9 +597,10 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
             )
             return redirect('cases:detail', pk=case.pk)
         
+        requirements = self.get_service().get_registration_requirements(case)
+        
         # Verifica se há dispositivos cadastrados
-        devices_count = case.case_devices.filter(deleted_at__isnull=True).count()
-        if devices_count == 0:
+        if not requirements['has_devices']:
             messages.error(
                 request,
                 'É necessário cadastrar pelo menos um dispositivo antes de finalizar o cadastro do processo.'
@@ -523,8 +608,7 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
             return redirect('cases:update', pk=case.pk)
         
         # Verifica se há procedimentos cadastrados
-        procedures_count = case.procedures.filter(deleted_at__isnull=True).count()
-        if procedures_count == 0:
+        if not requirements['has_procedures']:
             messages.error(
                 request,
                 'É necessário cadastrar pelo menos um procedimento antes de finalizar o cadastro do processo.'
@@ -534,18 +618,16 @@ class CaseCompleteRegistrationView(LoginRequiredMixin, ServiceMixin, View):
         form = CaseCompleteRegistrationForm(request.POST)
         
         if not form.is_valid():
-            devices_without_extraction = case.case_devices.filter(
-                deleted_at__isnull=True,
-                device_extraction__isnull=True
-            ).count()
+            # As contagens só são necessárias para reexibir o formulário
+            counts = self.get_service().get_related_counts(case)
             
             return render(request, self.template_name, {
                 'case': case,
                 'form': form,
-                'devices_count': devices_count,
-                'procedures_count': procedures_count,
-                'devices_without_extraction': devices_without_extraction,
-                'page_title': f'Finalizar Cadastro - Processo {case.number if case.number else f"#{case.pk}"}',
+                'devices_count': counts['devices_count'],
+                'procedures_count': counts['procedures_count'],
+                'devices_without_extraction': counts['devices_without_extraction'],
+                'page_title': f'Finalizar Cadastro - Processo {case.display_number}',
                 'page_icon': 'fa-check-circle',
             })
         
@@ -596,20 +678,17 @@ class CaseDevicesView(LoginRequiredMixin, DetailView):
         """
         Filtra apenas casos não deletados
         """
-        return Case.objects.filter(deleted_at__isnull=True)
+        return Case.objects.active()
     
     def get_context_data(self, **kwargs):
         """
         Adiciona os dispositivos do caso ao contexto
         """
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
+        case = self.object
         
         # Filtra apenas dispositivos não deletados
-        devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
-            'device_category',
-            'device_model__brand'
-        )
+        devices = get_case_devices_for_list(case)
         
         # Verifica se está editando um dispositivo
         edit_device_id = self.request.GET.get('edit')
@@ -617,7 +696,10 @@ class CaseDevicesView(LoginRequiredMixin, DetailView):
         
         if edit_device_id:
             try:
-                editing_device = devices.get(pk=edit_device_id)
+                editing_device = case.case_devices.get(
+                    pk=edit_device_id,
+                    deleted_at__isnull=True
+                )
                 # Cria formulário com instância do dispositivo
                 form = CaseDeviceForm(instance=editing_device, case=case)
                 context['editing_device_id'] = editing_device.pk
@@ -629,7 +711,7 @@ class CaseDevicesView(LoginRequiredMixin, DetailView):
             form = CaseDeviceForm(case=case)
             context['editing_device_id'] = None
         
-        context['page_title'] = f'Processo {case.number if case.number else f"#{case.pk}"} - Dispositivos'
+        context['page_title'] = f'Processo {case.display_number} - Dispositivos'
         context['page_icon'] = 'fa-mobile-alt'
         context['devices'] = devices
         context['device_form'] = form
@@ -656,23 +738,20 @@ class CaseProceduresView(LoginRequiredMixin, DetailView):
         """
         Filtra apenas casos não deletados
         """
-        return Case.objects.filter(deleted_at__isnull=True)
+        return Case.objects.active()
     
     def get_context_data(self, **kwargs):
         """
         Adiciona os procedimentos e dispositivos do caso ao contexto
         """
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
+        case = self.object
         
         # Filtra apenas procedimentos não deletados
         procedures = case.procedures.filter(deleted_at__isnull=True).select_related('procedure_category')
         
         # Filtra apenas dispositivos não deletados
-        devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
-            'device_category',
-            'device_model__brand'
-        )
+        devices = get_case_devices_for_list(case)
         
         # Verifica se está editando um procedimento
         edit_procedure_id = self.request.GET.get('edit')
@@ -692,7 +771,7 @@ class CaseProceduresView(LoginRequiredMixin, DetailView):
             form = CaseProcedureForm(case=case)
             context['editing_procedure_id'] = None
         
-        context['page_title'] = f'Processo {case.number if case.number else f"#{case.pk}"} - Procedimentos'
+        context['page_title'] = f'Processo {case.display_number} - Procedimentos'
         context['page_icon'] = 'fa-gavel'
         context['procedures'] = procedures
         context['procedure_form'] = form
@@ -711,14 +790,14 @@ class CaseDocumentsView(LoginRequiredMixin, DetailView):
         """
         Filtra apenas casos não deletados
         """
-        return Case.objects.filter(deleted_at__isnull=True)
+        return Case.objects.active()
     
     def get_context_data(self, **kwargs):
         """
         Adiciona os documentos do caso ao contexto
         """
         context = super().get_context_data(**kwargs)
-        case = self.get_object()
+        case = self.object
         
         # Filtra apenas documentos não deletados
         documents = case.documents.filter(deleted_at__isnull=True).select_related('document_category')
@@ -741,7 +820,7 @@ class CaseDocumentsView(LoginRequiredMixin, DetailView):
             form = CaseDocumentForm(case=case)
             context['editing_document_id'] = None
         
-        context['page_title'] = f'Processo {case.number if case.number else f"#{case.pk}"} - Documentos'
+        context['page_title'] = f'Processo {case.display_number} - Documentos'
         context['page_icon'] = 'fa-file-alt'
         context['documents'] = documents
         context['document_form'] = form
@@ -785,17 +864,6 @@ class CreateExtractionsView(LoginRequiredMixin, ServiceMixin, View):
             extractions = service.create_extractions_for_case(case)
             created_count = len(extractions)
             
-            # Coleta informações dos dispositivos para resposta
-            devices_info = []
-            for extraction in extractions:
-                device = extraction.case_device
-                device_info = {
-                    'id': device.pk,
-                    'model': f"{device.device_model.brand.name} - {device.device_model.name}" if device.device_model and device.device_model.brand else 'Sem modelo',
-                    'category': device.device_category.name if device.device_category else '-',
-                }
-                devices_info.append(device_info)
-            
             # Adiciona mensagem de sucesso
             if created_count > 0:
                 messages.success(
@@ -810,6 +878,20 @@ class CreateExtractionsView(LoginRequiredMixin, ServiceMixin, View):
             
             # Se a requisição espera JSON, retorna JSON
             if request.headers.get('Accept') == 'application/json' or request.GET.get('format') == 'json':
+                # Dispositivos só são carregados para a resposta JSON (uma consulta para todos)
+                devices = CaseDevice.objects.filter(
+                    pk__in=[extraction.case_device_id for extraction in extractions]
+                ).select_related('device_category', 'device_model__brand') if extractions else []
+                
+                devices_info = []
+                for device in devices:
+                    device_info = {
+                        'id': device.pk,
+                        'model': get_device_model_label(device),
+                        'category': device.device_category.name if device.device_category else '-',
+                    }
+                    devices_info.append(device_info)
+                
                 return JsonResponse({
                     'success': True,
                     'created_count': created_count,
@@ -839,34 +921,28 @@ class CreateExtractionsView(LoginRequiredMixin, ServiceMixin, View):
         """
         try:
             case = get_object_or_404(
-                Case.objects.filter(deleted_at__isnull=True),
+                Case.objects.active(),
                 pk=pk
             )
             
-            # Busca dispositivos do caso que não têm extração associada
-            # Para OneToOneField reverso, precisamos usar exclude com valores existentes
-            devices_without_extraction = case.case_devices.filter(
-                deleted_at__isnull=True
-            ).exclude(
-                pk__in=Extraction.objects.values_list('case_device_id', flat=True)
-            ).select_related(
+            # Busca dispositivos do caso que não têm extração associada,
+            # trazendo apenas as colunas usadas na resposta
+            devices_without_extraction = self.get_service().get_devices_without_extraction(case).select_related(
                 'device_category',
                 'device_model__brand'
+            ).only(
+                'pk', 'case', 'is_imei_unknown', 'imei_01',
+                'device_category', 'device_category__name',
+                'device_model', 'device_model__name',
+                'device_model__brand', 'device_model__brand__name',
             )
             
             devices_info = []
             for device in devices_without_extraction:
                 try:
-                    model_str = 'Sem modelo'
-                    if device.device_model:
-                        if device.device_model.brand:
-                            model_str = f"{device.device_model.brand.name} - {device.device_model.name}"
-                        else:
-                            model_str = device.device_model.name or 'Sem modelo'
-                    
                     device_info = {
                         'id': device.pk,
-                        'model': model_str,
+                        'model': get_device_model_label(device),
                         'category': device.device_category.name if device.device_category else '-',
                         'imei': 'Desconhecido' if device.is_imei_unknown else (device.imei_01 or '-'),
                     }
@@ -882,7 +958,8 @@ class CreateExtractionsView(LoginRequiredMixin, ServiceMixin, View):
                     devices_info.append(device_info)
             
             return JsonResponse({
-                'devices_count': devices_without_extraction.count(),
+                # Cada dispositivo gera uma entrada; evita um novo COUNT no banco
+                'devices_count': len(devices_info),
                 'devices': devices_info,
                 'case_number': case.number or 'Rascunho'
             })
@@ -911,7 +988,7 @@ class CaseAssignToMeView(LoginRequiredMixin, ServiceMixin, View):
         try:
             # Verifica se já está atribuído antes de tentar atribuir
             case = service.get_object(pk)
-            if case.assigned_to == request.user:
+            if case.assigned_to_id == request.user.pk:
                 error_message = 'Este processo já está atribuído a você.'
                 if is_ajax:
                     return JsonResponse({
@@ -1006,19 +1083,238 @@ class CaseUnassignFromMeView(LoginRequiredMixin, ServiceMixin, View):
         return redirect('cases:detail', pk=pk)
 
 
+# Estilos de parágrafo e de tabela da capa em PDF, criados na primeira geração
+# e reutilizados. O ReportLab só é importado aqui e na própria geração da capa,
+# para que os demais processos/views não paguem o custo de importá-lo.
+@lru_cache(maxsize=None)
+def _get_cover_pdf_styles() -> Dict[str, Any]:
+    """
+    Retorna os estilos da capa do processo, montando-os apenas uma vez por processo
+    (getSampleStyleSheet, ParagraphStyle e TableStyle não dependem da requisição;
+    o mesmo TableStyle pode ser aplicado a várias tabelas). O dicionário é montado
+    localmente e só publicado (pelo lru_cache) completo, sem estado parcial
+    compartilhado entre threads.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    
+    styles = getSampleStyleSheet()
+    cover_styles = {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=12,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            spaceAfter=5,
+        ),
+        'header': ParagraphStyle(
+            'CustomHeader',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            spaceAfter=3,
+        ),
+        'subtitle': ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            spaceAfter=15,
+        ),
+        'normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            spaceAfter=8,
+        ),
+        'bold': ParagraphStyle(
+            'CustomBold',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            fontName='Helvetica-Bold',
+            spaceAfter=8,
+        ),
+        'doc_number': ParagraphStyle(
+            'DocNumber',
+            parent=styles['Normal'],
+            fontSize=16,
+            fontName='Helvetica-Bold',
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            backColor=colors.lightgrey,
+            borderPadding=8,
+            spaceAfter=15,
+        ),
+        'footer': ParagraphStyle(
+            'CustomFooter',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            spaceAfter=3,
+        ),
+    }
+    
+    box_commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOX', (0, 0), (-1, -1), 1, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 1), (-1, -1), 5),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+    ]
+    cover_styles.update({
+        # Quadros com título na primeira linha (assunto, procedimentos, documentos, origem)
+        'box': TableStyle(box_commands),
+        # Quadro de aparelhos: título ocupa as 2 colunas
+        'devices_box': TableStyle(box_commands + [('SPAN', (0, 0), (-1, 0))]),
+        'header_middle': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]),
+        'header_table': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),  # Logo principal à esquerda
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),  # Header centralizado
+            ('ALIGN', (2, 0), (2, 0), 'RIGHT'),  # Logo secundário à direita
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ]),
+        'tramitacoes': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 0),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 0),
+        ]),
+        'tramitacoes_box': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('BOX', (0, 0), (-1, -1), 1, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 1), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+        ]),
+    })
+    return cover_styles
+
+
+@lru_cache(maxsize=4)
+def _get_logo_size(logo: bytes) -> Tuple[int, int]:
+    """
+    Retorna (largura, altura) originais de um logo, decodificando a imagem
+    com o PIL apenas uma vez por conteúdo de logo.
+    """
+    from PIL import Image as PILImage
+    
+    with PILImage.open(BytesIO(logo)) as pil_img:
+        return pil_img.size
+
+
+def _logo_flowable(logo, max_height=None, max_width=None):
+    """
+    Monta o logo do cabeçalho mantendo a proporção da imagem, com altura
+    máxima de max_height (padrão 2 cm) e largura máxima de max_width (padrão 2,5 cm).
+    Sem logo (ou com imagem inválida) retorna um espaçador.
+    """
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, Spacer
+    
+    max_height = max_height or 2*cm
+    max_width = max_width or 2.5*cm
+    if not logo:
+        return Spacer(1, 0.1*cm)
+    try:
+        logo = bytes(logo)
+        original_width, original_height = _get_logo_size(logo)
+        aspect_ratio = original_width / original_height
+        width = max_height * aspect_ratio
+        if width > max_width:
+            width = max_width
+            height = width / aspect_ratio
+        else:
+            height = max_height
+        # O reportlab precisa de um novo stream a cada documento
+        return Image(BytesIO(logo), width=width, height=height)
+    except Exception:
+        return Spacer(1, 0.1*cm)
+
+
 class CaseCoverPDFView(LoginRequiredMixin, View):
     """
     Gera PDF da capa do processo para impressão
     """
+    # Tempo (s) em que o PDF gerado fica em cache
+    cache_timeout = 3600
+    
+    def get_cache_key(self, stamp: str) -> str:
+        """Chave do PDF em cache para o estado da capa"""
+        return f'cases:cover_pdf:{stamp}'
+    
+    def get_etag(self, stamp: str) -> str:
+        """
+        ETag da capa: o mesmo estado da chave de cache (get_cover_stamp) mais a
+        janela de cache_timeout em curso. Assim o 304 nunca vale por mais tempo
+        que a cópia do servidor, mesmo para uma alteração que o estado não capte.
+        """
+        window = int(time.time() // self.cache_timeout)
+        return f'"{stamp}-{window}"'
+    
+    def finalize_response(self, response, etag: str, filename: str):
+        """Cabeçalhos comuns ao PDF recém-gerado e ao servido do cache"""
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
+        # Conteúdo restrito a usuários autenticados: só o navegador guarda,
+        # revalidando com If-None-Match
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
     
     def get(self, request, pk):
         """
         Gera o PDF da capa do processo
         """
-        case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
-            pk=pk
-        )
+        # Relações lidas no cabeçalho, no quadro de origem e nas tramitações
+        case = get_object_or_404(Case.objects.active().for_cover(), pk=pk)
         
         # Verifica se o cadastro foi finalizado
         if not case.registration_completed_at:
@@ -1028,172 +1324,109 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
             )
             return redirect('cases:detail', pk=case.pk)
         
-        # Busca dispositivos do caso
-        devices = case.case_devices.filter(deleted_at__isnull=True).select_related(
+        # Busca configurações de relatórios (em cache)
+        reports_settings = ReportsSettings.get_current()
+        filename = f'capa_processo_{case.number or case.pk}.pdf'
+        
+        # Navegador já tem a capa deste mesmo estado do processo: 304 sem gerar nada
+        stamp = get_cover_stamp(case, reports_settings.updated_at if reports_settings else None)
+        etag = self.get_etag(stamp)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        
+        # PDF já gerado para este mesmo estado do processo
+        cache_key = self.get_cache_key(stamp) if settings.CASE_COVER_PDF_CACHE else None
+        if cache_key:
+            pdf_content = cache.get(cache_key)
+            if pdf_content is not None:
+                response = HttpResponse(pdf_content, content_type='application/pdf')
+                return self.finalize_response(response, etag, filename)
+        
+        # Busca dispositivos do caso (materializados uma vez; os quadros usam len e índices)
+        devices = list(case.case_devices.filter(deleted_at__isnull=True).select_related(
             'device_category',
             'device_model__brand'
-        )
+        ))
         
         # Busca procedimentos do caso
-        procedures = case.procedures.filter(deleted_at__isnull=True).select_related(
+        procedures = list(case.procedures.filter(deleted_at__isnull=True).select_related(
             'procedure_category'
-        )
+        ))
         
-        # Prepara dados para tramitações (baseado em eventos do processo)
+        # Prepara as linhas de tramitações (de, para, data, responsável),
+        # baseadas em eventos do processo, já no formato da tabela
         tramitacoes = []
         
+        # Unidade solicitante: usa a sigla se houver, senão o nome completo
+        requester_unit = case.requester_agency_unit
+        requester_unit_label = (requester_unit.acronym or requester_unit.name) if requester_unit else None
+        
         # Tramitação inicial: recebimento do processo (da delegacia para NEXT)
         if case.created_at:
-            origem_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'DM BARREIRA'
-            # Se a unidade solicitante tem sigla, usa ela, senão usa o nome completo
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                origem_nome = case.requester_agency_unit.acronym
-            tramitacoes.append({
-                'de': origem_nome,
-                'para': case.extraction_unit.acronym if case.extraction_unit else 'NEXT/COIN',
-                'data': case.created_at.strftime('%d/%m/%Y'),
-                'responsavel': case.created_by.get_full_name() if case.created_by and case.created_by.get_full_name() else (case.created_by.username if case.created_by else 'N/A')
-            })
+            tramitacoes.append([
+                requester_unit_label if requester_unit else 'DM BARREIRA',
+                case.extraction_unit.acronym if case.extraction_unit else 'NEXT/COIN',
+                format_cover_date(case.created_at),
+                get_user_display_name(case.created_by),
+            ])
         
         # Tramitação: devolução/finalização (de NEXT para a delegacia)
+        destino_nome = requester_unit_label if requester_unit else 'BARREIRA'
         if case.finished_at:
-            destino_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'BARREIRA'
-            # Se a unidade solicitante tem sigla, usa ela, senão usa o nome completo
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                destino_nome = case.requester_agency_unit.acronym
-            elif case.requester_agency_unit:
-                # Tenta extrair sigla do nome se possível
-                destino_nome = case.requester_agency_unit.name
-            tramitacoes.append({
-                'de': 'NEXT',
-                'para': destino_nome,
-                'data': case.finished_at.strftime('%d/%m/%Y'),
-                'responsavel': case.finished_by.get_full_name() if case.finished_by and case.finished_by.get_full_name() else (case.finished_by.username if case.finished_by else 'N/A')
-            })
+            tramitacoes.append([
+                'NEXT',
+                destino_nome,
+                format_cover_date(case.finished_at),
+                get_user_display_name(case.finished_by),
+            ])
         elif case.assigned_at and case.assigned_to:
             # Se não foi finalizado mas foi atribuído, mostra tramitação de atribuição
-            destino_nome = case.requester_agency_unit.name if case.requester_agency_unit else 'BARREIRA'
-            if case.requester_agency_unit and case.requester_agency_unit.acronym:
-                destino_nome = case.requester_agency_unit.acronym
-            tramitacoes.append({
-                'de': 'NEXT',
-                'para': destino_nome,
-                'data': case.assigned_at.strftime('%d/%m/%Y'),
-                'responsavel': case.assigned_to.get_full_name() if case.assigned_to.get_full_name() else case.assigned_to.username
-            })
+            tramitacoes.append([
+                'NEXT',
+                destino_nome,
+                format_cover_date(case.assigned_at),
+                get_user_display_name(case.assigned_to),
+            ])
         
         # Busca documentos do caso
-        documents = case.documents.filter(deleted_at__isnull=True).select_related(
+        documents = list(case.documents.filter(deleted_at__isnull=True).select_related(
             'document_category'
-        )
+        ))
         
-        # Busca todos os Ofícios de Solicitação (OFS) nos documentos
-        ofs_documents = documents.filter(
-            document_category__acronym__iexact='OFS'
-        ) if documents else []
+        # Busca todos os Ofícios de Solicitação (OFS) nos documentos já carregados
+        ofs_documents = [
+            document for document in documents
+            if document.document_category
+            and (document.document_category.acronym or '').lower() == 'ofs'
+        ]
         
-        # Prepara contexto
-        context = {
-            'case': case,
-            'devices': devices,
-            'procedures': procedures,
-            'documents': documents,
-            'ofs_documents': ofs_documents,
-            'tramitacoes': tramitacoes,
-            'extraction_unit': case.extraction_unit,
-            'requester_agency_unit': case.requester_agency_unit,
-        }
-        
-        # Busca configurações de relatórios
-        try:
-            reports_settings = ReportsSettings.objects.first()
-        except ReportsSettings.DoesNotExist:
-            reports_settings = None
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
         
-        # Gera o PDF usando reportlab diretamente
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, 
+        # Gera o PDF usando reportlab diretamente, escrevendo na própria resposta
+        response = HttpResponse(content_type='application/pdf')
+        doc = SimpleDocTemplate(response, pagesize=A4, 
                                rightMargin=1.5*cm, leftMargin=1.5*cm,
                                topMargin=1.5*cm, bottomMargin=1.5*cm)
         
         # Container para os elementos do PDF
         elements = []
-        styles = getSampleStyleSheet()
-        
-        # Estilos customizados
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=12,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=5,
-        )
-        
-        header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=3,
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=15,
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            spaceAfter=8,
-        )
-        
-        bold_style = ParagraphStyle(
-            'CustomBold',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold',
-            spaceAfter=8,
-        )
+        styles = _get_cover_pdf_styles()
+        title_style = styles['title']
+        header_style = styles['header']
+        subtitle_style = styles['subtitle']
+        normal_style = styles['normal']
+        bold_style = styles['bold']
         
         # Cabeçalho - usando configurações de relatórios se disponível
         # Cabeçalho em 3 colunas: logo principal | dados do header | logo secundário
         
         # Primeira coluna: Logo principal
-        logo_principal = Spacer(1, 0.1*cm)
-        if reports_settings and reports_settings.default_report_header_logo:
-            try:
-                from reportlab.platypus import Image
-                from PIL import Image as PILImage
-                # Carrega a imagem para obter dimensões originais
-                pil_img = PILImage.open(BytesIO(reports_settings.default_report_header_logo))
-                original_width, original_height = pil_img.size
-                # Calcula proporção mantendo altura máxima de 2cm
-                max_height = 2*cm
-                aspect_ratio = original_width / original_height
-                calculated_width = max_height * aspect_ratio
-                # Limita largura máxima a 2.5cm
-                if calculated_width > 2.5*cm:
-                    calculated_width = 2.5*cm
-                    calculated_height = calculated_width / aspect_ratio
-                else:
-                    calculated_height = max_height
-                # Recria o BytesIO para usar no reportlab
-                logo_bytes = BytesIO(reports_settings.default_report_header_logo)
-                logo_principal = Image(logo_bytes, width=calculated_width, height=calculated_height)
-            except Exception:
-                pass
+        logo_principal = _logo_flowable(
+            reports_settings.default_report_header_logo if reports_settings else None
+        )
         
         # Segunda coluna: Dados do header (mais larga) - criar uma lista de elementos
         header_elements = []
@@ -1214,53 +1447,17 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         # Criar uma tabela interna para a coluna do meio com os textos empilhados
         header_middle_data = [[elem] for elem in header_elements]
         header_middle_table = Table(header_middle_data, colWidths=[10*cm])
-        header_middle_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-        ]))
+        header_middle_table.setStyle(styles['header_middle'])
         
         # Terceira coluna: Logo secundário
-        logo_secundario = Spacer(1, 0.1*cm)
-        if reports_settings and reports_settings.secondary_report_header_logo:
-            try:
-                from reportlab.platypus import Image
-                from PIL import Image as PILImage
-                # Carrega a imagem para obter dimensões originais
-                pil_img = PILImage.open(BytesIO(reports_settings.secondary_report_header_logo))
-                original_width, original_height = pil_img.size
-                # Calcula proporção mantendo altura máxima de 2cm
-                max_height = 2*cm
-                aspect_ratio = original_width / original_height
-                calculated_width = max_height * aspect_ratio
-                # Limita largura máxima a 2.5cm
-                if calculated_width > 2.5*cm:
-                    calculated_width = 2.5*cm
-                    calculated_height = calculated_width / aspect_ratio
-                else:
-                    calculated_height = max_height
-                # Recria o BytesIO para usar no reportlab
-                logo_bytes = BytesIO(reports_settings.secondary_report_header_logo)
-                logo_secundario = Image(logo_bytes, width=calculated_width, height=calculated_height)
-            except Exception:
-                pass
+        logo_secundario = _logo_flowable(
+            reports_settings.secondary_report_header_logo if reports_settings else None
+        )
         
         # Criar tabela de 3 colunas para o cabeçalho
         header_table_data = [[logo_principal, header_middle_table, logo_secundario]]
         header_table = Table(header_table_data, colWidths=[3*cm, 10*cm, 3*cm])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),  # Logo principal à esquerda
-            ('ALIGN', (1, 0), (1, 0), 'CENTER'),  # Header centralizado
-            ('ALIGN', (2, 0), (2, 0), 'RIGHT'),  # Logo secundário à direita
-            ('LEFTPADDING', (0, 0), (-1, -1), 5),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-            ('TOPPADDING', (0, 0), (-1, -1), 5),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ]))
+        header_table.setStyle(styles['header_table'])
         
         elements.append(header_table)
         elements.append(Spacer(1, 0.5*cm))
@@ -1268,18 +1465,7 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         # Número do documento
         extraction_unit_acronym = case.extraction_unit.acronym if case.extraction_unit and case.extraction_unit.acronym else 'NEXT'
         doc_number = f"{case.number or case.pk} - {extraction_unit_acronym}"
-        doc_number_style = ParagraphStyle(
-            'DocNumber',
-            parent=styles['Normal'],
-            fontSize=16,
-            fontName='Helvetica-Bold',
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            backColor=colors.lightgrey,
-            borderPadding=8,
-            spaceAfter=15,
-        )
-        elements.append(Paragraph(doc_number, doc_number_style))
+        elements.append(Paragraph(doc_number, styles['doc_number']))
         elements.append(Spacer(1, 0.5*cm))
         
         # Quadro de Assunto
@@ -1288,23 +1474,7 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         subject_data.append([Paragraph("Extração de dados", normal_style)])
         
         subject_table = Table(subject_data, colWidths=[18*cm])
-        subject_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 5),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-        ]))
+        subject_table.setStyle(styles['box'])
         elements.append(subject_table)
         elements.append(Spacer(1, 0.5*cm))
         
@@ -1312,33 +1482,15 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         if procedures:
             procedures_data = []
             procedures_data.append([Paragraph("<b>Procedimentos</b>", bold_style)])
-            for procedure in procedures:
-                if procedure.procedure_category:
-                    procedure_text = procedure.procedure_category.name
-                    if procedure.number:
-                        procedure_text += f" - {procedure.number}"
-                    procedures_data.append([Paragraph(procedure_text, normal_style)])
+            procedures_data.extend(
+                [Paragraph(get_category_item_text(procedure.procedure_category, procedure.number), normal_style)]
+                for procedure in procedures if procedure.procedure_category
+            )
             
             if len(procedures_data) > 1:  # Se há pelo menos um procedimento além do título
                 # Largura da página A4 menos margens (21cm - 3cm = 18cm)
                 procedures_table = Table(procedures_data, colWidths=[18*cm])
-                procedures_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 5),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                ]))
+                procedures_table.setStyle(styles['box'])
                 elements.append(procedures_table)
                 elements.append(Spacer(1, 0.5*cm))
         
@@ -1346,42 +1498,19 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         if documents:
             documents_data = []
             documents_data.append([Paragraph("<b>Documentos</b>", bold_style)])
-            for document in documents:
-                if document.document_category:
-                    document_text = document.document_category.name
-                    if document.number:
-                        document_text += f" - {document.number}"
-                    documents_data.append([Paragraph(document_text, normal_style)])
+            documents_data.extend(
+                [Paragraph(get_category_item_text(document.document_category, document.number), normal_style)]
+                for document in documents if document.document_category
+            )
             
             if len(documents_data) > 1:  # Se há pelo menos um documento além do título
                 # Largura da página A4 menos margens (21cm - 3cm = 18cm)
                 documents_table = Table(documents_data, colWidths=[18*cm])
-                documents_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 5),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                ]))
+                documents_table.setStyle(styles['box'])
                 elements.append(documents_table)
                 elements.append(Spacer(1, 0.5*cm))
         
         # Quadro de Origem
-        # Busca todos os Ofícios de Solicitação (OFS) nos documentos
-        ofs_documents = documents.filter(
-            document_category__acronym__iexact='OFS'
-        ) if documents else []
-        
         origin_data = []
         origin_data.append([Paragraph("<b>Origem</b>", bold_style)])
         
@@ -1402,79 +1531,32 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         
         # Ofícios
         if ofs_documents:
-            oficio_numbers = []
-            for ofs_document in ofs_documents:
-                oficio_text = ofs_document.number if ofs_document.number else "-"
-                oficio_numbers.append(oficio_text)
-            oficio_text = ", ".join(oficio_numbers)
+            oficio_text = ", ".join(ofs_document.number or "-" for ofs_document in ofs_documents)
             origin_data.append([Paragraph(f"<b>Ofício:</b> {oficio_text}", normal_style)])
-        elif case.extraction_request and case.extraction_request.request_procedures:
-            origin_data.append([Paragraph(f"<b>Ofício:</b> {case.extraction_request.request_procedures}", normal_style)])
+        elif case.extraction_request_procedures:
+            origin_data.append([Paragraph(f"<b>Ofício:</b> {case.extraction_request_procedures}", normal_style)])
         
         if len(origin_data) > 1:  # Se há pelo menos um item além do título
             origin_table = Table(origin_data, colWidths=[18*cm])
-            origin_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 1), (-1, -1), 5),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-            ]))
+            origin_table.setStyle(styles['box'])
             elements.append(origin_table)
             elements.append(Spacer(1, 0.5*cm))
         
         # Quadro de Aparelhos
-        if devices:
+        devices_count = len(devices)
+        if devices_count:
             # Preparar dados dos aparelhos para tabela de 2 colunas
             devices_table_data = []
             # Primeira linha: título que ocupa as 2 colunas
-            devices_table_data.append([Paragraph(f"<b>Aparelhos ({len(devices)})</b>", bold_style), ""])
+            devices_table_data.append([Paragraph(f"<b>Aparelhos ({devices_count})</b>", bold_style), ""])
             
             # Dividir dispositivos em pares (2 colunas)
-            for i in range(0, len(devices), 2):
-                row = []
-                # Primeira coluna
-                device1 = devices[i]
-                device1_text = ""
-                if device1.device_model:
-                    device1_text = f"{device1.device_model.brand.name} {device1.device_model.name}"
-                else:
-                    device1_text = "DISPOSITIVO"
-                
-                if device1.color:
-                    device1_text += f" - {device1.color}"
-                
-                if device1.imei_01:
-                    device1_text += f" - IMEI: {device1.imei_01}"
-                
-                row.append(Paragraph(device1_text, normal_style))
+            for i in range(0, devices_count, 2):
+                row = [Paragraph(get_device_cover_text(devices[i]), normal_style)]
                 
                 # Segunda coluna (se houver segundo dispositivo)
-                if i + 1 < len(devices):
-                    device2 = devices[i + 1]
-                    device2_text = ""
-                    if device2.device_model:
-                        device2_text = f"{device2.device_model.brand.name} {device2.device_model.name}"
-                    else:
-                        device2_text = "DISPOSITIVO"
-                    
-                    if device2.color:
-                        device2_text += f" - {device2.color}"
-                    
-                    if device2.imei_01:
-                        device2_text += f" - IMEI: {device2.imei_01}"
-                    
-                    row.append(Paragraph(device2_text, normal_style))
+                if i + 1 < devices_count:
+                    row.append(Paragraph(get_device_cover_text(devices[i + 1]), normal_style))
                 else:
                     # Se não houver segundo dispositivo, deixa vazio
                     row.append(Spacer(1, 0.1*cm))
@@ -1483,24 +1565,7 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
             
             # Criar tabela do quadro de aparelhos
             devices_table = Table(devices_table_data, colWidths=[9*cm, 9*cm])
-            devices_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('SPAN', (0, 0), (-1, 0)),  # Título ocupa as 2 colunas
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 1), (-1, -1), 5),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-            ]))
+            devices_table.setStyle(styles['devices_box'])
             
             elements.append(devices_table)
             elements.append(Spacer(1, 0.5*cm))
@@ -1516,75 +1581,29 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
             ['DE', 'PARA', 'DATA', 'RESPONSÁVEL']
         ]
         
-        # Dados (se houver)
-        if tramitacoes:
-            for tramitacao in tramitacoes:
-                tramitacoes_data.append([
-                    tramitacao['de'],
-                    tramitacao['para'],
-                    tramitacao['data'],
-                    tramitacao['responsavel']
-                ])
-        else:
-            # Uma linha vazia se não houver dados
-            tramitacoes_data.append(['', '', '', ''])
+        # Dados (se houver); uma linha vazia se não houver dados
+        tramitacoes_data.extend(tramitacoes or [['', '', '', '']])
         
         # Adicionar 5 linhas vazias para preenchimento manual
         for i in range(5):
             tramitacoes_data.append(['', '', '', ''])
         
         tramitacoes_table = Table(tramitacoes_data, colWidths=[4*cm, 4*cm, 3*cm, 5*cm])
-        tramitacoes_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 0),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 0),
-        ]))
+        tramitacoes_table.setStyle(styles['tramitacoes'])
         
         # Adicionar tabela de tramitações ao quadro
         tramitacoes_box_data.append([tramitacoes_table])
         
         # Criar tabela do quadro de tramitações
         tramitacoes_box_table = Table(tramitacoes_box_data, colWidths=[18*cm])
-        tramitacoes_box_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 5),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-        ]))
+        tramitacoes_box_table.setStyle(styles['tramitacoes_box'])
         
         elements.append(tramitacoes_box_table)
         
         # Rodapé - usando configurações de relatórios se disponível
         if reports_settings:
             elements.append(Spacer(1, 1*cm))
-            footer_style = ParagraphStyle(
-                'CustomFooter',
-                parent=styles['Normal'],
-                fontSize=9,
-                textColor=colors.black,
-                alignment=TA_CENTER,
-                spaceAfter=3,
-            )
+            footer_style = styles['footer']
             if reports_settings.report_cover_footer_line_1:
                 elements.append(Paragraph(reports_settings.report_cover_footer_line_1, footer_style))
             if reports_settings.report_cover_footer_line_2:
@@ -1593,14 +1612,11 @@ class CaseCoverPDFView(LoginRequiredMixin, View):
         # Gera o PDF
         try:
             doc.build(elements)
-            pdf = buffer.getvalue()
-            buffer.close()
+            if cache_key:
+                cache.set(cache_key, response.content, self.cache_timeout)
             
             # Retorna o PDF como resposta HTTP
-            response = HttpResponse(pdf, content_type='application/pdf')
-            filename = f'capa_processo_{case.number or case.pk}.pdf'
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            return self.finalize_response(response, etag, filename)
         except Exception as e:
             messages.error(
                 request,
@@ -1621,12 +1637,12 @@ class CaseFinalizationView(LoginRequiredMixin, ServiceMixin, View):
         Exibe o formulário de finalização do processo
         """
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
         # Verifica se o usuário tem permissão
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para finalizar este processo. Apenas o responsável pode fazer isso.'
@@ -1678,7 +1694,7 @@ class CaseFinalizationView(LoginRequiredMixin, ServiceMixin, View):
             'form': form,
             'total_extractions': total_extractions,
             'completed_extractions': completed_extractions,
-            'page_title': f'Finalizar Processo {case.number if case.number else f"#{case.pk}"}',
+            'page_title': f'Finalizar Processo {case.display_number}',
             'page_icon': 'fa-check-circle',
         })
     
@@ -1687,12 +1703,12 @@ class CaseFinalizationView(LoginRequiredMixin, ServiceMixin, View):
         Processa a finalização do processo
         """
         case = get_object_or_404(
-            Case.objects.filter(deleted_at__isnull=True),
+            Case.objects.active(),
             pk=pk
         )
         
         # Verifica se o usuário tem permissão
-        if case.assigned_to and case.assigned_to != request.user:
+        if not case.is_editable_by(request.user):
             messages.error(
                 request,
                 'Você não tem permissão para finalizar este processo.'
@@ -1745,7 +1761,7 @@ class CaseFinalizationView(LoginRequiredMixin, ServiceMixin, View):
                 'form': form,
                 'total_extractions': total_extractions,
                 'completed_extractions': completed_extractions,
-                'page_title': f'Finalizar Processo {case.number if case.number else f"#{case.pk}"}',
+                'page_title': f'Finalizar Processo {case.display_number}',
                 'page_icon': 'fa-check-circle',
             })
         
@@ -1769,7 +1785,7 @@ class CaseFinalizationView(LoginRequiredMixin, ServiceMixin, View):
                 'form': form,
                 'total_extractions': total_extractions,
                 'completed_extractions': completed_extractions,
-                'page_title': f'Finalizar Processo {case.number if case.number else f"#{case.pk}"}',
+                'page_title': f'Finalizar Processo {case.display_number}',
                 'page_icon': 'fa-check-circle',
             })
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+    
+    def ready(self):
+        """Importa signals quando o app está pronto"""
+        import apps.core.signals  # noqa
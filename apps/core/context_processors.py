@@ -1,8 +1,23 @@
 """
 Context processors para o app core.
 Disponibiliza dados globais para todos os templates.
+
+Os valores são preguiçosos (SimpleLazyObject): a consulta só acontece se o
+template usar a variável, então parciais renderizados com request (ex.: modais
+AJAX) não pagam por dados que não exibem.
 """
-from apps.core.models import ExtractionAgency, ExtractorUser
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.models import ExtractionAgency
+from apps.core.services.base import get_extractor_user
+
+
+def _get_extraction_agency():
+    try:
+        # Busca a primeira (e única) agência de extração
+        return ExtractionAgency.objects.first()
+    except Exception:
+        return None
 
 
 def extraction_agency(request):
@@ -10,16 +25,9 @@ def extraction_agency(request):
     Adiciona informações da agência de extração ao contexto.
     Disponível em todos os templates como {{ extraction_agency }}.
     """
-    try:
-        # Busca a primeira (e única) agência de extração
-        agency = ExtractionAgency.objects.first()
-        return {
-            'extraction_agency': agency,
-        }
-    except Exception:
-        return {
-            'extraction_agency': None,
-        }
+    return {
+        'extraction_agency': SimpleLazyObject(_get_extraction_agency),
+    }
 
 
 def is_extractor_user(request):
@@ -31,16 +39,7 @@ def is_extractor_user(request):
         return {
             'is_extractor_user': False,
         }
-    
-    try:
-        ExtractorUser.objects.get(
-            user=request.user,
-            deleted_at__isnull=True
-        )
-        return {
-            'is_extractor_user': True,
-        }
-    except ExtractorUser.DoesNotExist:
-        return {
-            'is_extractor_user': False,
-        }
+
+    return {
+        'is_extractor_user': SimpleLazyObject(lambda: get_extractor_user(request.user) is not None),
+    }
@@ -1,8 +1,10 @@
 """
 Forms para o app core
 """
+from typing import Dict
 from django import forms
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from .models import (
     ExtractionAgency, ExtractionUnit, DocumentTemplate,
     ExtractorUser, ExtractionUnitExtractor,
@@ -12,6 +14,31 @@ from .models import (
 )
 
 
+class CachedChoicesFormMixin:
+    """
+    Usa opções em cache para renderizar selects de formulários de busca.
+
+    cached_choices_keys mapeia o nome do campo para a chave de cache das suas
+    opções. A validação de um valor enviado continua consultando o queryset
+    do campo; quem altera as tabelas de origem deve descartar as chaves.
+    """
+    cached_choices_keys: Dict[str, str] = {}
+    cached_choices_timeout = 300
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        for field_name, cache_key in self.cached_choices_keys.items():
+            field = self.fields[field_name]
+            choices = cache.get(cache_key)
+            if choices is None:
+                choices = [(obj.pk, field.label_from_instance(obj)) for obj in field.queryset]
+                cache.set(cache_key, choices, self.cached_choices_timeout)
+            if field.empty_label is not None:
+                choices = [('', field.empty_label)] + choices
+            field.choices = choices
+
+
 class ExtractionAgencyForm(forms.ModelForm):
     """Form para Agência de Extração"""
     
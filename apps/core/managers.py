@@ -61,6 +61,29 @@ class CaseQuerySet(AuditedQuerySet):
             'extractions__assigned_to__user'
         )
     
+    def for_cover(self):
+        """
+        Relations and annotations read by the case covers (PDF/ODT): header,
+        origin box, tramitações and the state stamp used for cache/ETag
+        """
+        # Local import: apps.cases.utils imports the Case model, which uses this module
+        from apps.cases.utils import get_cover_stamp_annotations, get_cover_user_deferred_fields
+        
+        return self.select_related(
+            'requester_agency_unit',
+            'requester_authority_position',
+            'extraction_unit',
+            'created_by',
+            'assigned_to',
+            'finished_by',
+        ).defer(
+            *get_cover_user_deferred_fields('created_by', 'assigned_to', 'finished_by')
+        ).annotate(
+            # Only the procedures text of the source extraction request is rendered
+            extraction_request_procedures=F('extraction_request__request_procedures'),
+            **get_cover_stamp_annotations()
+        )
+    
     def by_status(self, status):
         """Filter by case status"""
         return self.filter(status=status)
@@ -132,6 +155,9 @@ class CaseManager(AuditedManager):
     def by_status(self, status):
         return self.get_queryset().by_status(status)
     
+    def for_cover(self):
+        return self.get_queryset().for_cover()
+    
     def dashboard_summary(self):
         """Get cases summary for dashboard"""
         return self.active().aggregate(
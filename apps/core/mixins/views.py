@@ -3,7 +3,7 @@ Base mixins and views for common patterns
 """
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponseRedirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
@@ -12,7 +12,7 @@ from typing import Optional, Dict, Any
 from django.core.paginator import Paginator
 from django.db.models import QuerySet
 
-from apps.core.services.base import BaseService, ServiceException
+from apps.core.services.base import BaseService, ServiceException, get_extractor_user
 
 
 class StaffRequiredMixin(UserPassesTestMixin):
@@ -34,11 +34,7 @@ class StaffOrExtractorRequiredMixin(UserPassesTestMixin):
         
         # Verifica se é um extrator ativo
         try:
-            from apps.core.models import ExtractorUser
-            return ExtractorUser.objects.filter(
-                user=user,
-                deleted_at__isnull=True
-            ).exists()
+            return get_extractor_user(user) is not None
         except Exception:
             return False
 
@@ -74,6 +70,18 @@ class ServiceMixin:
         messages.error(self.request, str(exception))
 
 
+class CachedObjectMixin:
+    """
+    Mantém o objeto obtido por get_object() durante a requisição,
+    evitando novas consultas entre dispatch, form_valid e get_context_data.
+    """
+    
+    def get_object(self, *args, **kwargs):
+        if getattr(self, '_cached_object', None) is None:
+            self._cached_object = super().get_object(*args, **kwargs)
+        return self._cached_object
+
+
 class BaseListView(LoginRequiredMixin, StaffOrExtractorRequiredMixin, ServiceMixin, ListView):
     """Base list view with search and pagination"""
     
@@ -81,15 +89,17 @@ class BaseListView(LoginRequiredMixin, StaffOrExtractorRequiredMixin, ServiceMix
     search_form_class = None
 
     def _build_search_form(self):
-        """Build search form passing user when supported."""
+        """Build search form passing user when supported (once per request)."""
         if not self.search_form_class:
             return None
 
-        try:
-            return self.search_form_class(self.request.GET or None, user=self.request.user)
-        except TypeError:
-            # Backwards compatibility for forms that don't accept `user`
-            return self.search_form_class(self.request.GET or None)
+        if not hasattr(self, '_search_form'):
+            try:
+                self._search_form = self.search_form_class(self.request.GET or None, user=self.request.user)
+            except TypeError:
+                # Backwards compatibility for forms that don't accept `user`
+                self._search_form = self.search_form_class(self.request.GET or None)
+        return self._search_form
     
     def get_queryset(self) -> QuerySet:
         """Get filtered queryset using service"""
@@ -106,7 +116,8 @@ class BaseListView(LoginRequiredMixin, StaffOrExtractorRequiredMixin, ServiceMix
         """Get filters from request"""
         filters = {}
         
-        if self.search_form_class:
+        # Sem parâmetros na URL não há filtro a validar
+        if self.search_form_class and self.request.GET:
             form = self._build_search_form()
             if form.is_valid():
                 filters = form.cleaned_data
@@ -204,6 +215,10 @@ class BaseDeleteView(LoginRequiredMixin, StaffOrExtractorRequiredMixin, ServiceM
             self.handle_service_exception(e)
             return None
     
+    def form_valid(self, form):
+        """DeleteView.post chama form_valid; direciona para o soft delete"""
+        return self.delete(self.request, *self.args, **self.kwargs)
+    
     def delete(self, request, *args, **kwargs):
         """Perform soft delete using service"""
         service = self.get_service()
@@ -214,7 +229,7 @@ class BaseDeleteView(LoginRequiredMixin, StaffOrExtractorRequiredMixin, ServiceM
                 self.request,
                 _(f'{self.model._meta.verbose_name} excluído com sucesso!')
             )
-            return JsonResponse({'success': True}) if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest' else super().delete(request, *args, **kwargs)
+            return JsonResponse({'success': True}) if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest' else HttpResponseRedirect(self.get_success_url())
         except ServiceException as e:
             self.handle_service_exception(e)
             return JsonResponse({'success': False, 'error': str(e)}) if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest' else self.get(request, *args, **kwargs)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db import models
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from .base import AuditedModel
@@ -253,6 +254,24 @@ class ReportsSettings(AuditedModel):
         null=True
     )
     
+    CACHE_KEY = 'core:reports_settings'
+    CACHE_TIMEOUT = 3600
+    
+    @classmethod
+    def get_current(cls):
+        """
+        Retorna a configuração de relatórios vigente (ou None), mantida em cache.
+        
+        O cache é descartado em apps.core.signals sempre que a configuração
+        é salva ou excluída.
+        """
+        cached = cache.get(cls.CACHE_KEY)
+        if cached is None:
+            # Guarda em tupla para distinguir "sem configuração" de "não está em cache"
+            cached = (cls.objects.filter(deleted_at__isnull=True).order_by('pk').first(),)
+            cache.set(cls.CACHE_KEY, cached, cls.CACHE_TIMEOUT)
+        return cached[0]
+    
     def get_default_logo_base64(self):
         """
         Retorna o logo padrão em formato base64 para exibição em templates.
@@ -1,7 +1,9 @@
 """
 Base Service Class for centralized business logic
 """
+from datetime import date, datetime, time
 from django.db import transaction
+from django.utils import timezone
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.contrib.auth import get_user_model
 from typing import Dict, Any, Optional, List, Union
@@ -25,6 +27,24 @@ class PermissionServiceException(ServiceException):
     pass
 
 
+def get_extractor_user(user):
+    """
+    Retorna o ExtractorUser ativo do usuário, ou None se não for extrator.
+    O resultado fica memorizado na instância do usuário: para request.user a
+    consulta é feita uma vez por requisição, por mais que mixins, services e
+    context processors perguntem.
+    """
+    if not user or not getattr(user, 'is_authenticated', False):
+        return None
+    if not hasattr(user, '_extractor_user_cache'):
+        from apps.core.models import ExtractorUser
+        user._extractor_user_cache = ExtractorUser.objects.filter(
+            user=user,
+            deleted_at__isnull=True
+        ).first()
+    return user._extractor_user_cache
+
+
 class BaseService:
     """
     Base service class that provides common patterns for business logic.
@@ -120,12 +140,19 @@ class BaseService:
         if not self.validate_permissions('delete', instance):
             raise PermissionServiceException("Sem permissão para excluir")
         
-        # Soft delete
+        # Soft delete com UPDATE restrito às colunas de exclusão/auditoria,
+        # sem regravar a linha inteira nem disparar sinais de save
         from django.utils import timezone
-        instance.deleted_at = timezone.now()
+        now = timezone.now()
+        fields = {'deleted_at': now, 'updated_at': now}
         if self.user:
-            instance.deleted_by = self.user
-        instance.save()
+            fields['deleted_by'] = self.user
+            fields['updated_by'] = self.user
+        self.model_class.objects.filter(pk=instance.pk).update(**fields)
+        
+        # Avisa os caches que dependem da tabela (ex.: opções de selects)
+        from apps.core.signals import post_soft_delete
+        post_soft_delete.send(sender=self.model_class, instance=instance)
         
         return True
     
@@ -145,6 +172,17 @@ class BaseService:
         """Apply filters to queryset - override in subclasses"""
         return queryset
     
+    @staticmethod
+    def _start_of_day(day: date) -> datetime:
+        """
+        Retorna o início do dia no fuso horário corrente.
+
+        Usado para filtrar datas como intervalos sobre a própria coluna
+        (>= início do dia, < início do dia seguinte) em vez de __date, que
+        envolve a coluna em uma conversão e impede o uso do índice.
+        """
+        return timezone.make_aware(datetime.combine(day, time.min))
+    
     def get_user_extraction_units(self) -> List[int]:
         """
         Retorna lista de IDs das extraction_units vinculadas ao usuário.
@@ -185,10 +223,6 @@ class BaseService:
             return False
         
         try:
-            from apps.core.models import ExtractorUser
-            return ExtractorUser.objects.filter(
-                user=self.user,
-                deleted_at__isnull=True
-            ).exists()
+            return get_extractor_user(self.user) is not None
         except Exception:
             return False
\ No newline at end of file
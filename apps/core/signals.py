@@ -0,0 +1,20 @@
+"""
+Signals para o app core
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from .models import ReportsSettings
+
+
+# Enviado por BaseService.delete após o soft delete (um UPDATE direto, que não
+# dispara post_save/post_delete). Argumentos: sender (classe do modelo), instance.
+post_soft_delete = Signal()
+
+
+@receiver([post_save, post_delete], sender=ReportsSettings)
+def invalidate_reports_settings_cache(sender, **kwargs):
+    """
+    Descarta a configuração de relatórios em cache quando ela é alterada.
+    """
+    cache.delete(ReportsSettings.CACHE_KEY)
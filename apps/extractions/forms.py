@@ -4,13 +4,23 @@ Formulários para o app extractions
 from django import forms
 from apps.cases.models import Extraction
 from apps.core.models import ExtractionUnit, ExtractionUnitStorageMedia
+from apps.core.forms import CachedChoicesFormMixin
 from django.contrib.auth.models import User
 
 
-class ExtractionSearchForm(forms.Form):
+# Chaves de cache das opções dos selects do ExtractionSearchForm (invalidadas em apps.cases.signals)
+SEARCH_CHOICES_CACHE_KEYS = {
+    'extraction_unit': 'extractions:search_choices:extraction_unit',
+    'assigned_to': 'extractions:search_choices:assigned_to',
+}
+
+
+class ExtractionSearchForm(CachedChoicesFormMixin, forms.Form):
     """
     Formulário para busca/filtro de extrações
     """
+    cached_choices_keys = SEARCH_CHOICES_CACHE_KEYS
+    
     search = forms.CharField(
         required=False,
         label='Pesquisar',
@@ -1,12 +1,15 @@
 """
 Services for extractions app
 """
+from datetime import timedelta
 from typing import Dict, Any, Optional
 from django.db.models import Q, QuerySet
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from apps.core.services.base import BaseService, ValidationServiceException, PermissionServiceException
+from apps.core.services.base import (
+    BaseService, ValidationServiceException, PermissionServiceException, get_extractor_user
+)
 from apps.cases.models import Extraction
 from apps.core.models import ExtractorUser
 
@@ -158,11 +161,11 @@ class ExtractionService(BaseService):
         
         date_from = filters.get('date_from')
         if date_from:
-            queryset = queryset.filter(created_at__date__gte=date_from)
+            queryset = queryset.filter(created_at__gte=self._start_of_day(date_from))
         
         date_to = filters.get('date_to')
         if date_to:
-            queryset = queryset.filter(created_at__date__lte=date_to)
+            queryset = queryset.filter(created_at__lt=self._start_of_day(date_to + timedelta(days=1)))
         
         return queryset
     
@@ -171,12 +174,8 @@ class ExtractionService(BaseService):
         if not self.user or not hasattr(self.user, 'is_authenticated') or not self.user.is_authenticated:
             raise PermissionServiceException("Usuário não autenticado")
         
-        try:
-            extractor_user = ExtractorUser.objects.get(
-                user=self.user,
-                deleted_at__isnull=True
-            )
-        except ExtractorUser.DoesNotExist:
+        extractor_user = get_extractor_user(self.user)
+        if extractor_user is None:
             return self.model_class.objects.none()
         
         return self.get_queryset().filter(assigned_to=extractor_user)
@@ -192,13 +191,10 @@ class ExtractionService(BaseService):
         if not self.user or not hasattr(self.user, 'is_authenticated') or not self.user.is_authenticated:
             raise PermissionServiceException("Usuário não autenticado")
         
-        try:
-            return ExtractorUser.objects.get(
-                user=self.user,
-                deleted_at__isnull=True
-            )
-        except ExtractorUser.DoesNotExist:
+        extractor_user = get_extractor_user(self.user)
+        if extractor_user is None:
             raise PermissionServiceException("Usuário não é um extrator")
+        return extractor_user
     
     def assign_to_me(self, extraction_pk: int) -> Extraction:
         """Assign extraction to current user"""
@@ -57,7 +57,7 @@ class ExtractionListView(ExtractionUnitFilterMixin, LoginRequiredMixin, ServiceM
         context['page_title'] = 'Extrações'
         context['page_icon'] = 'fa-database'
         context['form'] = self.search_form_class(self.request.GET or None)
-        context['total_count'] = self.get_queryset().count()
+        context['total_count'] = context['paginator'].count
         return context
 
 
@@ -71,7 +71,7 @@ class CaseExtractionsView(LoginRequiredMixin, DetailView):
     
     def get_queryset(self):
         """Filtra apenas casos não deletados"""
-        return Case.objects.filter(deleted_at__isnull=True)
+        return Case.objects.active()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -83,12 +83,11 @@ class CaseExtractionsView(LoginRequiredMixin, DetailView):
         
         # Verifica se há dispositivos sem extração
         devices_without_extraction = case.case_devices.filter(
-            deleted_at__isnull=True
-        ).exclude(
-            pk__in=Extraction.objects.values_list('case_device_id', flat=True)
+            deleted_at__isnull=True,
+            device_extraction__isnull=True
         ).exists()
         
-        context['page_title'] = f'Extrações - Processo {case.number if case.number else f"#{case.pk}"}'
+        context['page_title'] = f'Extrações - Processo {case.display_number}'
         context['page_icon'] = 'fa-database'
         context['extractions'] = extractions
         context['has_devices_without_extractions'] = devices_without_extraction
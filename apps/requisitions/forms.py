@@ -6,6 +6,7 @@ from django.utils import timezone
 from apps.requisitions.models import ExtractionRequest
 from apps.base_tables.models import AgencyUnit, EmployeePosition, CrimeCategory
 from apps.core.models import ExtractionUnit
+from apps.core.forms import CachedChoicesFormMixin
 from apps.core.services.base import BaseService
 
 
@@ -161,10 +162,20 @@ class ExtractionRequestForm(forms.ModelForm):
         return amount
 
 
-class ExtractionRequestSearchForm(forms.Form):
+# Chaves de cache das opções dos selects do ExtractionRequestSearchForm (invalidadas em apps.cases.signals).
+# extraction_unit depende do usuário e não entra no cache.
+SEARCH_CHOICES_CACHE_KEYS = {
+    'requester_agency_unit': 'requisitions:search_choices:requester_agency_unit',
+    'crime_category': 'requisitions:search_choices:crime_category',
+}
+
+
+class ExtractionRequestSearchForm(CachedChoicesFormMixin, forms.Form):
     """
     Formulário para busca/filtro de solicitações
     """
+    cached_choices_keys = SEARCH_CHOICES_CACHE_KEYS
+    
     search = forms.CharField(
         required=False,
         label='Pesquisar',
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requisitions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='extractionrequest',
+            index=models.Index(fields=['deleted_at', 'requested_at'], name='extraction__deleted_dc981c_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18
+
+from django.db import migrations
+
+
+FULLTEXT_INDEX_NAME = 'extraction_request_search_fulltext'
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Cria o índice FULLTEXT usado pela busca de solicitações (somente MySQL)"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'CREATE FULLTEXT INDEX {FULLTEXT_INDEX_NAME} ON `extraction_request` '
+        '(request_procedures, requester_authority_name, additional_info)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(f'DROP INDEX {FULLTEXT_INDEX_NAME} ON `extraction_request`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requisitions', '0002_extractionrequest_requested_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
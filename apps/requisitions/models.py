@@ -73,6 +73,10 @@ class ExtractionRequest(AbstractCaseModel):
         db_table = 'extraction_request'
         verbose_name = _('Solicitação de Extração')
         verbose_name_plural = _('Solicitações de Extração')
+        indexes = [
+            # Filtros de data por intervalo sobre requested_at, apenas entre os não excluídos
+            models.Index(fields=['deleted_at', 'requested_at']),
+        ]
 
     def __str__(self):
         return f"{self.requester_agency_unit.name if self.requester_agency_unit else 'N/A'} - {self.requested_at}"
@@ -2,9 +2,10 @@
 Services for requisitions app
 """
 import logging
+from datetime import timedelta
 from typing import Dict, Any, Optional, List
 from django.db.models import Q, QuerySet, Count, Sum, Case, When, IntegerField
-from django.db import transaction
+from django.db import connection, transaction
 from django.utils import timezone
 from django.db.models.functions import TruncMonth
 
@@ -12,6 +13,9 @@ from apps.core.services.base import BaseService, ValidationServiceException
 from apps.requisitions.models import ExtractionRequest
 from apps.core.models import ExtractionUnit
 from apps.base_tables.models import AgencyUnit
+from apps.cases.utils import (
+    EXTRACTION_REQUEST_FULLTEXT_FIELDS, build_fulltext_query, get_fulltext_search_ids
+)
 
 
 class ExtractionRequestService(BaseService):
@@ -109,17 +113,39 @@ class ExtractionRequestService(BaseService):
             # Em caso de erro, retorna queryset completo
             return queryset
     
-    def apply_filters(self, queryset: QuerySet, filters: Dict[str, Any]) -> QuerySet:
-        """Apply filters to queryset"""
-        search = filters.get('search')
-        if search:
-            queryset = queryset.filter(
+    def _apply_search(self, queryset: QuerySet, search: str) -> QuerySet:
+        """
+        Aplica a busca textual.
+
+        No MySQL usa o índice FULLTEXT das colunas de texto da solicitação e
+        casa a unidade solicitante por subconsulta, cada critério resolvido
+        em separado (UNION de ids). Nos demais bancos, ou com termos curtos
+        demais para o índice, mantém a busca por icontains.
+        """
+        fulltext_query = build_fulltext_query(search)
+        if connection.vendor != 'mysql' or not fulltext_query:
+            return queryset.filter(
                 Q(request_procedures__icontains=search) |
                 Q(requester_authority_name__icontains=search) |
                 Q(additional_info__icontains=search) |
                 Q(requester_agency_unit__name__icontains=search) |
                 Q(requester_agency_unit__acronym__icontains=search)
             )
+
+        agency_unit_ids = AgencyUnit.objects.filter(
+            Q(name__icontains=search) | Q(acronym__icontains=search)
+        ).values('pk')
+
+        return queryset.filter(pk__in=get_fulltext_search_ids(
+            ExtractionRequest, EXTRACTION_REQUEST_FULLTEXT_FIELDS, fulltext_query,
+            Q(requester_agency_unit__in=agency_unit_ids)
+        ))
+
+    def apply_filters(self, queryset: QuerySet, filters: Dict[str, Any]) -> QuerySet:
+        """Apply filters to queryset"""
+        search = filters.get('search')
+        if search:
+            queryset = self._apply_search(queryset, search)
         
         status = filters.get('status')
         if status:
@@ -148,11 +174,11 @@ class ExtractionRequestService(BaseService):
         
         date_from = filters.get('date_from')
         if date_from:
-            queryset = queryset.filter(requested_at__date__gte=date_from)
+            queryset = queryset.filter(requested_at__gte=self._start_of_day(date_from))
         
         date_to = filters.get('date_to')
         if date_to:
-            queryset = queryset.filter(requested_at__date__lte=date_to)
+            queryset = queryset.filter(requested_at__lt=self._start_of_day(date_to + timedelta(days=1)))
         
         return queryset
     
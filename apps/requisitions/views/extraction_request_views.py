@@ -47,7 +47,7 @@ class ExtractionRequestListView(ExtractionUnitFilterMixin, BaseListView):
                 context['form'] = self.search_form_class(self.request.GET or None, user=self.request.user)
             except TypeError:
                 context['form'] = self.search_form_class(self.request.GET or None)
-        context['total_count'] = self.get_queryset().count()
+        context['total_count'] = context['paginator'].count
         return context
 
 
@@ -293,7 +293,7 @@ class ExtractionRequestNotReceivedView(ExtractionUnitFilterMixin, LoginRequiredM
             context['form'] = self.search_form_class(self.request.GET or None, user=self.request.user)
         except TypeError:
             context['form'] = self.search_form_class(self.request.GET or None)
-        context['total_count'] = self.get_queryset().count()
+        context['total_count'] = context['paginator'].count
         return context
 
 
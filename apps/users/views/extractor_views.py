@@ -14,7 +14,7 @@ from apps.core.mixins.views import ServiceMixin
 from apps.cases.models import Extraction, Case
 from apps.extractions.forms import ExtractionSearchForm
 from apps.extractions.services import ExtractionService
-from apps.core.models import ExtractorUser
+from apps.core.services.base import get_extractor_user
 from apps.cases.forms import CaseSearchForm
 from apps.cases.services import CaseService
 
@@ -26,12 +26,8 @@ def extractor_home_view(request):
     Focada em cases e extractions associados ao extrator.
     """
     # Verifica se o usuário é um extrator
-    try:
-        extractor_user = ExtractorUser.objects.get(
-            user=request.user,
-            deleted_at__isnull=True
-        )
-    except ExtractorUser.DoesNotExist:
+    extractor_user = get_extractor_user(request.user)
+    if extractor_user is None:
         messages.error(
             request,
             'Você não é um usuário extrator. Apenas extratores podem acessar esta página.'
@@ -100,12 +96,7 @@ class MyExtractionsView(LoginRequiredMixin, ServiceMixin, ListView):
     
     def dispatch(self, request, *args, **kwargs):
         """Verifica se o usuário é um extrator antes de permitir acesso"""
-        try:
-            ExtractorUser.objects.get(
-                user=request.user,
-                deleted_at__isnull=True
-            )
-        except ExtractorUser.DoesNotExist:
+        if get_extractor_user(request.user) is None:
             messages.error(
                 request,
                 'Você não é um usuário extrator. Apenas extratores podem acessar esta página.'
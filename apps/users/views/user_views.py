@@ -18,13 +18,12 @@ from apps.core.mixins.views import ServiceMixin
 from apps.users.models import UserProfile
 from apps.users.forms import UserProfileForm, ChangePasswordForm
 from apps.users.services import UserProfileService
-from apps.core.services.base import ServiceException
+from apps.core.services.base import ServiceException, get_extractor_user
 from apps.cases.models import Case
 from apps.cases.forms import CaseSearchForm
 from apps.cases.services import CaseService
 from apps.requisitions.models import ExtractionRequest
 from apps.cases.models import Case, Extraction
-from apps.core.models import ExtractorUser
 from django.db.models import Count, Q
 
 
@@ -35,23 +34,17 @@ def home_view(request):
     Redireciona extratores para sua home específica.
     """
     # Verifica se o usuário é um extrator e redireciona
-    try:
-        ExtractorUser.objects.get(
-            user=request.user,
-            deleted_at__isnull=True
-        )
+    if get_extractor_user(request.user) is not None:
         # Se for extrator, redireciona para a home de extratores
         return redirect('users:extractor_home')
-    except ExtractorUser.DoesNotExist:
-        pass
     
     # Para usuários não-extratores: comportamento original
-    total_cases = Case.objects.filter(deleted_at__isnull=True).count()
+    total_cases = Case.objects.active().count()
     active_cases = Case.objects.filter(status=Case.CASE_STATUS_IN_PROGRESS, deleted_at__isnull=True).count()
     pending_requests = ExtractionRequest.objects.filter(status=ExtractionRequest.REQUEST_STATUS_PENDING, deleted_at__isnull=True).count()
     active_extractions = Extraction.objects.filter(status=Extraction.STATUS_IN_PROGRESS, deleted_at__isnull=True).count()
     
-    recent_cases = Case.objects.filter(deleted_at__isnull=True).order_by('-updated_at')[:5]
+    recent_cases = Case.objects.active().order_by('-updated_at')[:5]
 
     context = {
         'page_title': 'Dashboard',
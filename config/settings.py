@@ -192,6 +192,15 @@ LOGOUT_REDIRECT_URL = '/next/login/'
 # Default number of items per page in list views
 PAGINATE_BY = int(os.environ.get('PAGINATE_BY', '25'))
 
+# Bulk insert settings
+# Maximum number of extractions inserted per INSERT statement
+EXTRACTION_BULK_BATCH_SIZE = int(os.environ.get('EXTRACTION_BULK_BATCH_SIZE', '500'))
+
+# Case cover cache settings
+# Keep generated case cover PDFs/ODTs in the cache until the case or its related rows change
+CASE_COVER_PDF_CACHE = os.environ.get('CASE_COVER_PDF_CACHE', '1') == '1'
+CASE_COVER_ODT_CACHE = os.environ.get('CASE_COVER_ODT_CACHE', '1') == '1'
+
 # CSRF Settings
 CSRF_COOKIE_HTTPONLY = False  # Permite JavaScript acessar o cookie CSRF se necessário
 CSRF_COOKIE_SAMESITE = 'Lax'